@@ -10,7 +10,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Never imported by the app; keeping them out shrinks what --onefile unpacks at launch
+    excludes=['tkinter', 'matplotlib', 'IPython', 'scipy', 'pytest'],
     noarchive=False,
     optimize=0,
 )
@@ -26,7 +27,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,  # UPX-packed DLLs are decompressed on every start
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
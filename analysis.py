@@ -1,9 +1,15 @@
+import numpy as np
 import pandas as pd
 import json
 import re
+from functools import lru_cache
 
-# Load Excel file
-df = pd.read_excel("x.xlsx", sheet_name="Sheet1")
+from excel_cache import read_excel
+
+# Load Excel file (streamed once, then served from the column cache). Every
+# column is read: the keyword scan covers the whole row and the instructor
+# falls back to the last non-empty cell, prerequisites included
+df = read_excel("x.xlsx", "Sheet1")
 
 # Keywords to look for
 keywords = ["عيادة", "عملي", "مختبر"]
@@ -18,7 +24,14 @@ old_campus_clinics = [
     "عيادة علم أمراض اللثة 3"
 ]
 
-# Clean and normalize session names
+DAY_RE = re.compile(r"(سبت|احد|اثنين|ثلاث|اربعاء|خميس|جمعة)")
+TIME_RE = re.compile(r"(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})")
+KEYWORD_RE = re.compile("|".join(map(re.escape, keywords)))
+LAB_RE = re.compile("عملي|مختبر")
+
+# Clean and normalize session names (the same raw name repeats across sections,
+# so each distinct one is cleaned once)
+@lru_cache(maxsize=None)
 def clean_session_name(name):
     if pd.isna(name):
         return ""
@@ -36,58 +49,57 @@ def clean_session_name(name):
     # Rejoin and strip
     return " ".join(clean_parts).strip()
 
+# Every cell as text ("" for empty) and all of a row's cells joined, column-wise
+cells = [df[c].where(df[c].notna(), "").astype(str) for c in df.columns]
+row_text = cells[0].str.cat(cells[1:], sep=" ")
+
+# Rows mentioning a clinic / practical / lab, and the first cell that does
+has_keyword = np.column_stack([col.str.contains(KEYWORD_RE).to_numpy() for col in cells])
+selected = has_keyword.any(axis=1)
+first_keyword_col = has_keyword.argmax(axis=1)
+
+# Detect day and time range on the joined text in one pass each
+day = row_text.str.extract(DAY_RE, expand=False).fillna("غير محدد").tolist()
+times = row_text.str.extract(TIME_RE).fillna("")
+start_time, end_time = times[0].tolist(), times[1].tolist()
+
+# Instructor (last non-null cell)
+instructor = df.astype(object).ffill(axis=1).iloc[:, -1].astype(str).tolist()
+
+raw_names = df.to_numpy(dtype=object)[np.arange(len(df)), first_keyword_col]
+
 # Dictionary to hold grouped data
 schedule_by_day = {}
 
-# Loop through each row
-for _, row in df.iterrows():
-    # Combine all row cells into a single string for keyword search
-    row_text = " ".join([str(cell) for cell in row if pd.notna(cell)])
-
-    if any(keyword in row_text for keyword in keywords):
-        # Detect day
-        day_match = re.search(r"(سبت|احد|اثنين|ثلاث|اربعاء|خميس|جمعة)", row_text)
-        day = day_match.group(0) if day_match else "غير محدد"
-
-        # Extract time
-        time_match = re.search(r"(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})", row_text)
-        start_time, end_time = time_match.groups() if time_match else ("", "")
-
-        # Instructor (last non-null cell)
-        instructor = str(row.dropna().iloc[-1])
-
-        # Full session name containing keyword
-        session_name = ""
-        for cell in row:
-            if pd.notna(cell) and any(k in str(cell) for k in keywords):
-                session_name = clean_session_name(cell)
-                break
-
-        # Determine location
-        if any(k in session_name for k in ["عملي", "مختبر"]):
-            location = "New Campus"
-        elif session_name in old_campus_clinics:
-            location = "Old Campus"
-        else:
-            location = "CELT"
-
-        # Build session entry
-        entry = {
-            "Clinic": session_name,
-            "From": start_time,
-            "To": end_time,
-            "Instructor": instructor
-        }
-
-        # Initialize day if not exists
-        if day not in schedule_by_day:
-            schedule_by_day[day] = {"New Campus": [], "Old Campus": [], "CELT": []}
-
-        # Append session to the correct location
-        schedule_by_day[day][location].append(entry)
+for i in selected.nonzero()[0]:
+    # Full session name containing keyword
+    session_name = clean_session_name(raw_names[i])
+
+    # Determine location
+    if LAB_RE.search(session_name):
+        location = "New Campus"
+    elif session_name in old_campus_clinics:
+        location = "Old Campus"
+    else:
+        location = "CELT"
+
+    # Build session entry
+    entry = {
+        "Clinic": session_name,
+        "From": start_time[i],
+        "To": end_time[i],
+        "Instructor": instructor[i]
+    }
+
+    # Initialize day if not exists
+    if day[i] not in schedule_by_day:
+        schedule_by_day[day[i]] = {"New Campus": [], "Old Campus": [], "CELT": []}
+
+    # Append session to the correct location
+    schedule_by_day[day[i]][location].append(entry)
 
 # Save to JSON
 with open("schedule_by_day_location.json", "w", encoding="utf-8") as f:
     json.dump(schedule_by_day, f, ensure_ascii=False, indent=4)
 
-print("✅ Schedule grouped by day and location saved to schedule_by_day_location.json")
\ No newline at end of file
+print("✅ Schedule grouped by day and location saved to schedule_by_day_location.json")
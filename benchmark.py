@@ -0,0 +1,234 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import master
+import ta_sched
+from export_cache import finish_workbook
+from registrar import rows_to_dataframe, rows_to_records
+
+# -------------------------------
+# Synthetic registrar data
+# -------------------------------
+SUBJECTS = [
+    "طب الأسنان التحفظي", "مداواة الأسنان اللبية", "جراحة الفم والأسنان والفكين",
+    "علم أمراض اللثة", "استعاضة سنية متحركة", "تركيبات سنية", "طب أسنان الأطفال",
+    "تقويم الأسنان", "أشعة الفم والأسنان", "طب الفم", "مواد طب الأسنان",
+    "علم التشريح", "علم المناعة للصيدلة وطب الأسنان", "علم الأدوية", "الكيمياء الحيوية",
+]
+FIRST_NAMES = ["محمد", "أحمد", "دينا", "عبير", "ساري", "فايزه", "عفاف", "حسني", "غالب", "رامي",
+               "سلمى", "يوسف", "ليلى", "خالد", "منى", "طارق", "هبة", "سامر", "نور", "بلال"]
+LAST_NAMES = ["بكر", "هموز", "دار ديك", "حسين", "النجاجره", "علي", "فادري", "عودة", "شلبي",
+              "الخطيب", "عمرو", "جرار", "صوافطة", "دويكات", "قاسم", "مصري", "حنون", "طه"]
+DAYS = ["سبت", "احد", "اثنين", "ثلاث", "اربعاء", "خميس"]
+CAMPUSES = ["الجديد", "القديم"]
+
+def synthetic_rows(n, seed=0):
+    """n registrar rows (same 12 columns as the materials table), roughly one third clinics/labs."""
+    rng = random.Random(seed)
+    instructors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(max(10, n // 15))]
+    instructors.append("لم يحدد")
+    rooms = {
+        "الجديد": [f"{rng.randint(10, 24)}{rng.choice('BFG')}{rng.randint(0, 3)}{rng.randint(1, 30):02d}0"
+                   for _ in range(max(10, n // 25))],
+        "القديم": [f"{rng.randint(2, 9)}{rng.randint(1, 3)}{rng.randint(1, 40):02d}0" for _ in range(max(5, n // 50))],
+    }
+
+    # The exporters merge one cell range per session, so like the real timetable a
+    # room (and a course on a given day) never holds two overlapping sessions
+    room_free, course_free = {}, {}
+    levels = max(9, n // 400)
+    rows = []
+    for _ in range(50 * n):
+        if len(rows) == n:
+            break
+        subject = rng.choice(SUBJECTS)
+        level = rng.randint(1, levels)
+        kind = rng.random()
+        if kind < 0.2:
+            course = f"عيادة {subject} {level}"
+        elif kind < 0.3:
+            course = f"{subject} {level}/ عملي"
+        elif kind < 0.35:
+            course = f"مختبر {subject} {level}"
+        else:
+            course = f"{subject} {level}"
+        day = rng.choice(DAYS)
+        campus = rng.choice(CAMPUSES)
+        room = rng.choice(rooms[campus])
+        length = rng.choice([60, 60, 90, 120, 120, 180])
+        start = max(room_free.get((room, day), 8*60), course_free.get((course, day), 8*60))
+        start += rng.choice([0, 0, 30, 60])
+        if start + length > 20*60:
+            continue
+        room_free[(room, day)] = course_free[(course, day)] = start + length
+        rows.append([
+            "", "", f"{len(rows) % 9 + 1}/75{rng.randint(0, 99999):05d}", course, str(rng.randint(1, 4)),
+            day, f"{start // 60}:{start % 60:02d} - {(start + length) // 60}:{(start + length) % 60:02d}",
+            room, campus, "", rng.choice(instructors), "",
+        ])
+    if len(rows) < n:
+        raise ValueError(f"could not place {n} sessions without clashes")
+    return rows
+
+# -------------------------------
+# Phase measurement
+# -------------------------------
+def run_phases(phases, memory):
+    """Run (name, fn) pairs in order, each fn taking the previous result; returns records."""
+    records = []
+    result = None
+    for name, fn in phases:
+        if memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn(result)
+        seconds = time.perf_counter() - t0
+        record = {"phase": name, "seconds": round(seconds, 4)}
+        if memory:
+            record["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+        records.append(record)
+    return records
+
+def master_phases(rows, out_dir):
+    def save(workbooks):
+        for wb, path, hashes, _ in workbooks:
+            finish_workbook(wb, path, hashes, {}, out_dir)
+    # No assignment phase: master.py does not assign workers
+    return [
+        ("classification", lambda _: master.classify(rows_to_dataframe(rows))),
+        ("layout", lambda schedules: master.layout(*schedules, {}, out_dir)),
+        ("save", save),
+    ]
+
+def ta_sched_phases(rows, total_workers, out_dir):
+    output_file = os.path.join(out_dir, "Scheduale.xlsx")
+    return [
+        ("classification", lambda _: ta_sched.extract_clinics(rows_to_records(rows))),
+        ("assignment", lambda clinics: ta_sched.assign_workers(clinics, total_workers)),
+        ("layout", lambda assigned: ta_sched.layout(*assigned, output_file, {})),
+        ("save", lambda built: finish_workbook(built[0], output_file, built[1], {})),
+    ]
+
+def benchmark(sizes, seed=0, memory=True):
+    results = []
+    for n in sizes:
+        rows = synthetic_rows(n, seed)
+        total_workers = max(10, n // 25)
+        for script, make_phases in [
+            ("master", lambda d: master_phases(rows, d)),
+            ("ta_sched", lambda d: ta_sched_phases(rows, total_workers, d)),
+        ]:
+            # Timings come from a run without tracemalloc, which would slow everything down
+            with tempfile.TemporaryDirectory() as d:
+                timed = run_phases(make_phases(d), memory=False)
+            if memory:
+                with tempfile.TemporaryDirectory() as d:
+                    for record, traced in zip(timed, run_phases(make_phases(d), memory=True)):
+                        record["peak_mb"] = traced["peak_mb"]
+            for record in timed:
+                results.append({"size": n, "script": script, **record})
+            total = sum(r["seconds"] for r in timed)
+            print(f"{script:9s} n={n:6d}  " + "  ".join(f"{r['phase']}={r['seconds']:.3f}s" for r in timed)
+                  + f"  total={total:.3f}s")
+    return results
+
+# -------------------------------
+# Startup: import time and launch-to-prompt
+# -------------------------------
+PROMPT = b"Enter total number of workers"
+STARTUP_MODULES = ["ta_sched", "registrar", "master"]
+
+def import_seconds(module, runs=5):
+    """Fresh-interpreter import time of one module, per run."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                 check=True).stdout) for _ in range(runs)]
+
+def launch_to_prompt(cmd, runs=5):
+    """Seconds from process start until the worker-count prompt shows up on stdout, per run."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        seen = b""
+        while PROMPT not in seen:
+            chunk = proc.stdout.read1(256)
+            if not chunk:
+                raise RuntimeError(f"{cmd[0]} exited before asking for the worker count")
+            seen += chunk
+        times.append(time.perf_counter() - t0)
+        proc.kill()
+        proc.wait()
+    return times
+
+def startup(cmd, runs=5):
+    results = []
+    for module in STARTUP_MODULES:
+        times = import_seconds(module, runs)
+        results.append({"what": f"import {module}", "median": round(statistics.median(times), 4),
+                        "min": round(min(times), 4)})
+    times = launch_to_prompt(cmd, runs)
+    results.append({"what": "launch to prompt: " + " ".join(cmd), "median": round(statistics.median(times), 4),
+                    "min": round(min(times), 4)})
+    for r in results:
+        print(f"{r['what']:45s} median={r['median']:.3f}s  min={r['min']:.3f}s")
+    return results
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["script"], r["phase"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["size"], r["script"], r["phase"]))
+        if old and old["seconds"] > 0:
+            print(f"{r['script']:9s} n={r['size']:6d} {r['phase']:15s} x{r['seconds'] / old['seconds']:.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile the export pipeline on synthetic schedules")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--startup", nargs="*", metavar="CMD",
+                        help="measure import and launch-to-prompt time instead (default: python ta_sched.py, "
+                             "or pass the frozen binary)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {
+        "version": git_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    if args.startup is not None:
+        report["startup"] = startup(args.startup or [sys.executable, "ta_sched.py"], args.runs)
+        results = []
+    else:
+        results = benchmark(args.sizes, args.seed, memory=not args.no_memory)
+        report.update({"seed": args.seed, "results": results})
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ Benchmark results saved to {args.out}")
+    if args.compare and results:
+        compare(results, args.compare)
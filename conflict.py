@@ -1,9 +1,7 @@
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
-from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, PatternFill
+from conflict_engine import find_conflicts, write_conflict_report
 
 # -------------------------------
 # 1. Send POST request
@@ -90,56 +88,13 @@ for _, row in lecture_df.iterrows():
 # -------------------------------
 # 4. Detect conflicts among lectures
 # -------------------------------
-def parse_time(t):
-    return datetime.strptime(t.strip(), "%H:%M")
-
-conflicts = []
-for day, lectures in schedule.items():
-    rooms = {}
-    for lec in lectures:
-        rooms.setdefault(lec["Room"], []).append(lec)
-
-    for room, room_lectures in rooms.items():
-        room_lectures.sort(key=lambda x: parse_time(x["From"]))
-        for i in range(len(room_lectures) - 1):
-            lec1 = room_lectures[i]
-            lec2 = room_lectures[i + 1]
-            start1, end1 = parse_time(lec1["From"]), parse_time(lec1["To"])
-            start2, end2 = parse_time(lec2["From"]), parse_time(lec2["To"])
-            if start2 < end1:  # Overlap
-                conflicts.append([
-                    day,
-                    room,
-                    lec1["Course"], lec1["Instructor"], lec1["From"], lec1["To"],
-                    lec2["Course"], lec2["Instructor"], lec2["From"], lec2["To"],
-                ])
+# Sweep over every room's sorted endpoints so a long lecture clashing with
+# one two slots later is reported too, not only adjacent pairs.
+lectures = [dict(lec, Day=day) for day, day_lectures in schedule.items() for lec in day_lectures]
+groups, pairs = find_conflicts(lectures, ["room"])
 
 # -------------------------------
 # 5. Export conflicts to Excel
 # -------------------------------
-wb = Workbook()
-ws = wb.active
-ws.title = "Conflicts"
-
-headers = [
-    "Day", "Room",
-    "Course 1", "Instructor 1", "From 1", "To 1",
-    "Course 2", "Instructor 2", "From 2", "To 2"
-]
-ws.append(headers)
-
-for row in conflicts:
-    ws.append(row)
-
-# Style headers
-for cell in ws[1]:
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-    cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-
-# Auto column width
-for col in ws.columns:
-    max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
-    ws.column_dimensions[col[0].column_letter].width = max(12, max_length + 2)
-
-wb.save("lecture_conflicts.xlsx")
-print("✅ Lecture-only conflict report saved as 'lecture_conflicts.xlsx'")
\ No newline at end of file
+write_conflict_report(groups, pairs, "lecture_conflicts.xlsx")
+print("✅ Lecture-only conflict report saved as 'lecture_conflicts.xlsx'")
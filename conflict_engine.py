@@ -0,0 +1,169 @@
+import argparse
+
+from names import name_key
+from schedule_io import canonical_location, day_sort_key, days_of, has_time, load_sessions, real_room, time_to_minutes
+
+# -------------------------------
+# Sweep-line conflict engine
+# -------------------------------
+# For every resource (room, instructor, worker, campus) all session
+# endpoints are sorted once by (resource key, day, time) and swept with an
+# active set. Every start that finds the active set already at capacity
+# opens (or extends) a conflict group, and every session active inside the
+# group is reported - not only neighbours in sorted order.
+#
+# Placeholder rooms (509999 ...) are not rooms and never clash. Campuses
+# have no natural capacity, so the campus check only runs when one is given
+# ({campus: max parallel sessions}, e.g. the "location_capacity" config).
+
+RESOURCE_TYPES = ["room", "instructor", "worker", "location"]
+
+def resource_keys(s, resource):
+    if resource == "room":
+        room = real_room(s.get("Room"))
+        return [room] if room else []
+    if resource == "instructor":
+        instr = name_key(s.get("Instructor"))
+        return [instr] if instr else []
+    if resource == "worker":
+        return [w for w in s.get("Workers", []) if w]
+    if resource == "location":
+        loc = canonical_location(s.get("Location"))
+        return [loc] if loc else []
+    raise ValueError(f"unknown resource type: {resource}")
+
+def sweep(sessions, resource, capacity=None):
+    """Return (groups, pairs) for one resource type.
+
+    groups: one record per over-capacity window with every session involved.
+    pairs:  every overlapping (a, b) session pair, for capacity-1 resources.
+    """
+    capacity = capacity or {}
+    events = []
+    for idx, s in enumerate(sessions):
+        if not has_time(s):
+            continue
+        start, end = time_to_minutes(s["From"]), time_to_minutes(s["To"])
+        if end <= start:
+            continue
+        days = days_of(s["Day"])  # a multi-day session is swept on each of its weekdays
+        for key in resource_keys(s, resource):
+            for day in days:
+                # Ends sort before starts at the same minute: back-to-back is not a clash
+                events.append((str(key), day_sort_key(day), day, start, 1, idx))
+                events.append((str(key), day_sort_key(day), day, end, 0, idx))
+    events.sort()
+
+    groups, pairs = [], []
+    active = set()
+    group = None
+    current = None
+    for key, _, day, t, is_start, idx in events:
+        if (key, day) != current:
+            current = (key, day)
+            active.clear()
+            group = None
+        limit = capacity.get(key, 1)
+        if not is_start:
+            active.discard(idx)
+            if group is not None and len(active) <= limit:
+                group["To"] = t
+                groups.append(group)
+                group = None
+            continue
+
+        if limit == 1:
+            pairs += [(resource, key, day, other, idx) for other in sorted(active)]
+        active.add(idx)
+        if len(active) > limit:
+            if group is None:
+                group = {"Type": resource, "Key": key, "Day": day, "From": t, "To": t,
+                         "Capacity": limit, "Peak": 0, "Sessions": set()}
+            group["Sessions"] |= active
+            group["Peak"] = max(group["Peak"], len(active))
+
+    for g in groups:
+        g["Sessions"] = [sessions[i] for i in sorted(g["Sessions"])]
+        g["From"] = f"{g['From'] // 60:02d}:{g['From'] % 60:02d}"
+        g["To"] = f"{g['To'] // 60:02d}:{g['To'] % 60:02d}"
+    pairs = [(r, k, d, sessions[a], sessions[b]) for r, k, d, a, b in pairs]
+    return groups, pairs
+
+def find_conflicts(sessions, resources=None, capacities=None):
+    """Run the sweep for each resource type; returns (groups, pairs) over all of them.
+
+    capacities: {campus: max parallel sessions}; campuses not in it are not checked.
+    """
+    resources = resources or RESOURCE_TYPES
+    all_groups, all_pairs = [], []
+    for resource in resources:
+        if resource == "location":
+            capacity = {canonical_location(loc): n for loc, n in (capacities or {}).items()}
+            # Only the campuses given a capacity are checked
+            groups, pairs = sweep([s for s in sessions if canonical_location(s.get("Location")) in capacity],
+                                  resource, capacity)
+        else:
+            groups, pairs = sweep(sessions, resource)
+        all_groups += groups
+        all_pairs += pairs
+    return all_groups, all_pairs
+
+# -------------------------------
+# Excel report (lecture_conflicts.xlsx style)
+# -------------------------------
+def style_sheet(ws):
+    from openpyxl.styles import Alignment, PatternFill
+
+    # Style headers
+    for cell in ws[1]:
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
+
+    # Auto column width
+    for col in ws.columns:
+        max_length = max(len(str(cell.value)) if cell.value else 0 for cell in col)
+        ws.column_dimensions[col[0].column_letter].width = max(12, max_length + 2)
+
+def write_conflict_report(groups, pairs, path):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Conflicts"
+    ws.append([
+        "Type", "Day", "Resource",
+        "Course 1", "Instructor 1", "From 1", "To 1",
+        "Course 2", "Instructor 2", "From 2", "To 2"
+    ])
+    for resource, key, day, a, b in pairs:
+        ws.append([
+            resource, day, key,
+            a["Course"], a.get("Instructor", ""), a["From"], a["To"],
+            b["Course"], b.get("Instructor", ""), b["From"], b["To"],
+        ])
+    style_sheet(ws)
+
+    ws = wb.create_sheet("Groups")
+    ws.append(["Type", "Day", "Resource", "From", "To", "Peak", "Capacity", "Sessions"])
+    for g in groups:
+        ws.append([
+            g["Type"], g["Day"], g["Key"], g["From"], g["To"], g["Peak"], g["Capacity"],
+            " | ".join(f"{s['Course']} ({s['From']}-{s['To']})" for s in g["Sessions"]),
+        ])
+    style_sheet(ws)
+    wb.save(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Room, instructor, worker and campus conflict report")
+    parser.add_argument("--clinics", default="assigned_schedule_updated.json")
+    parser.add_argument("--lectures", default="other_schedule.json")
+    parser.add_argument("--resources", nargs="+", choices=RESOURCE_TYPES, default=RESOURCE_TYPES)
+    parser.add_argument("--location-capacity", nargs="+", default=[], metavar="CAMPUS=N",
+                        help="max parallel sessions per campus; the campus check is skipped without it")
+    parser.add_argument("--out", default="schedule_conflicts.xlsx")
+    args = parser.parse_args()
+
+    capacities = {loc: int(n) for loc, n in (item.rsplit("=", 1) for item in args.location_capacity)}
+    groups, pairs = find_conflicts(load_sessions(args.clinics, args.lectures), args.resources, capacities)
+    write_conflict_report(groups, pairs, args.out)
+    print(f"✅ {len(groups)} conflict groups ({len(pairs)} overlapping pairs) saved to {args.out}")
@@ -0,0 +1,148 @@
+import argparse
+import json
+
+import numpy as np
+
+from schedule_io import day_sort_key, expand_days, has_time, load_json, time_to_minutes
+from time_grid import build_time_grid, grid_labels
+
+# -------------------------------
+# Worker coverage / shortfall
+# -------------------------------
+# required[l, d, t] and assigned[l, d, t] count the workers needed and the
+# workers actually placed at location l on day d in grid slot t. Both are
+# painted with difference arrays (+n at the first slot, -n after the last)
+# and one cumsum, the same way occupancy.py builds its tensor. Wherever
+# assigned < required the schedule is short-staffed.
+
+REPORT_NAME = "coverage_report.json"
+SHORTFALL_HEADERS = ["Day", "Location", "From", "To", "Required", "Assigned", "Missing"]
+SESSION_HEADERS = ["Day", "Location", "Course", "From", "To", "Required", "Assigned", "Missing"]
+
+class Coverage:
+    def __init__(self, required, assigned, locations, days, grid, sessions):
+        self.required = required
+        self.assigned = assigned
+        self.locations = locations
+        self.days = days
+        self.grid = grid
+        self.sessions = sessions  # flat session records with Required / Assigned counts
+
+    @property
+    def shortfall(self):
+        return np.clip(self.required - self.assigned, 0, None)
+
+    def windows(self):
+        """Contiguous slot runs with a shortfall, per location and day, with peak counts."""
+        labels = grid_labels(self.grid) + [None]
+        short = self.shortfall
+        # Run boundaries: where "short or not" flips along the slot axis
+        flag = np.pad(short > 0, ((0, 0), (0, 0), (1, 1))).astype(np.int8)
+        edges = np.diff(flag, axis=2)
+        starts = np.argwhere(edges == 1)
+        ends = np.argwhere(edges == -1)
+        windows = []
+        for (l, d, a), (_, _, b) in zip(starts, ends):
+            peak = int(short[l, d, a:b].max())
+            worst = a + int(short[l, d, a:b].argmax())
+            to = labels[b] if labels[b] else _end_label(self.grid)
+            windows.append({
+                "Day": self.days[d], "Location": self.locations[l], "From": labels[a], "To": to,
+                "Required": int(self.required[l, d, worst]), "Assigned": int(self.assigned[l, d, worst]),
+                "Missing": peak,
+            })
+        return windows
+
+    def unstaffed(self):
+        return [s for s in self.sessions if s["Assigned"] < s["Required"]]
+
+    def report(self):
+        required = sum(s["Required"] for s in self.sessions)
+        assigned = sum(s["Assigned"] for s in self.sessions)
+        return {
+            "grid": {"start": grid_labels(self.grid)[0] if self.grid.size else None,
+                     "step_minutes": self.grid.step, "slots": self.grid.size},
+            "totals": {"sessions": len(self.sessions), "unstaffed_sessions": len(self.unstaffed()),
+                       "required_slots": required, "assigned_slots": assigned,
+                       "missing_slots": required - assigned},
+            "shortfalls": self.windows(),
+            "sessions": self.unstaffed(),
+        }
+
+def _end_label(grid):
+    end = grid.start + grid.size * grid.step
+    return f"{end // 60:02d}:{end % 60:02d}"
+
+def flatten_assignment(assigned_schedule, required_for):
+    """day -> location -> sessions (with Workers) into flat records with staffing counts."""
+    records = []
+    for day, locs in assigned_schedule.items():
+        for loc, sessions in locs.items():
+            for s in sessions:
+                # Older exports keep a single "Worker" per session under "Clinic"
+                course = s.get("Course", s.get("Clinic", ""))
+                workers = s["Workers"] if "Workers" in s else [s.get("Worker")]
+                required = required_for(dict(s, Course=course), loc)
+                assigned = sum(1 for w in workers if w is not None)
+                records.append({"Day": day, "Location": loc, "Course": course, "From": s["From"],
+                                "To": s["To"], "Required": required, "Assigned": assigned,
+                                "Missing": max(required - assigned, 0)})
+    return records
+
+def build_coverage(assigned_schedule, required_for, grid=None):
+    sessions = [s for s in expand_days(flatten_assignment(assigned_schedule, required_for)) if has_time(s)]
+    grid = grid or build_time_grid(sessions)
+    locations = sorted({s["Location"] for s in sessions})
+    days = sorted({s["Day"] for s in sessions}, key=day_sort_key)
+    loc_index = {l: i for i, l in enumerate(locations)}
+    day_index = {d: i for i, d in enumerate(days)}
+
+    n = len(sessions)
+    l = np.fromiter((loc_index[s["Location"]] for s in sessions), dtype=np.intp, count=n)
+    d = np.fromiter((day_index[s["Day"]] for s in sessions), dtype=np.intp, count=n)
+    start = np.fromiter((time_to_minutes(s["From"]) for s in sessions), dtype=np.int64, count=n)
+    end = np.fromiter((time_to_minutes(s["To"]) for s in sessions), dtype=np.int64, count=n)
+    first = np.clip((start - grid.start) // grid.step, 0, grid.size)
+    last = np.clip(-((grid.start - end) // grid.step), 0, grid.size)  # ceil division
+
+    def paint(weights):
+        diff = np.zeros((len(locations), len(days), grid.size + 1), dtype=np.int32)
+        np.add.at(diff, (l, d, first), weights)
+        np.add.at(diff, (l, d, last), -weights)
+        return np.cumsum(diff, axis=2)[:, :, :grid.size]
+
+    required = paint(np.fromiter((s["Required"] for s in sessions), dtype=np.int32, count=n))
+    assigned = paint(np.fromiter((s["Assigned"] for s in sessions), dtype=np.int32, count=n))
+    return Coverage(required, assigned, locations, days, grid, sessions)
+
+# -------------------------------
+# Excel sheet and JSON report
+# -------------------------------
+def write_shortfall_sheet(ws, cov):
+    from conflict_engine import style_sheet
+
+    ws.append(SHORTFALL_HEADERS)
+    for w in cov.windows():
+        ws.append([w[h] for h in SHORTFALL_HEADERS])
+    ws.append([])
+    ws.append(SESSION_HEADERS)
+    for s in cov.unstaffed():
+        ws.append([s[h] for h in SESSION_HEADERS])
+    style_sheet(ws)
+
+def save_report(cov, path=REPORT_NAME):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cov.report(), f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker coverage and shortfall report")
+    parser.add_argument("--schedule", default="assigned_schedule.json",
+                        help="day -> location -> sessions JSON with Workers lists")
+    parser.add_argument("--out", default=REPORT_NAME)
+    args = parser.parse_args()
+
+    from ta_sched import required_workers_for
+
+    cov = build_coverage(load_json(args.schedule), required_workers_for)
+    save_report(cov, args.out)
+    print(f"✅ {len(cov.unstaffed())} under-staffed sessions, report saved to {args.out}")
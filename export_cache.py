@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+
+# -------------------------------
+# Content-hashed export manifest
+# -------------------------------
+# Every rendered view (a workbook sheet, an HTML page, an ICS feed...) is
+# keyed by its output path (plus "#sheet" for workbook sheets) and stores the
+# hash of the sessions and styling inputs it was rendered from. A re-run only
+# regenerates the views whose hash changed.
+
+MANIFEST_NAME = ".export_manifest.json"
+
+def content_hash(*parts):
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:20]
+
+def manifest_path(out_dir):
+    return os.path.join(out_dir or ".", MANIFEST_NAME)
+
+def load_manifest(out_dir="."):
+    try:
+        with open(manifest_path(out_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, out_dir="."):
+    with open(manifest_path(out_dir), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+def manifest_key(path, out_dir="."):
+    return os.path.relpath(path, out_dir or ".").replace(os.sep, "/")
+
+def is_fresh(manifest, path, digest, out_dir="."):
+    return manifest.get(manifest_key(path, out_dir)) == digest and os.path.exists(path)
+
+def record(manifest, path, digest, out_dir="."):
+    manifest[manifest_key(path, out_dir)] = digest
+
+def prune(manifest, keep, prefixes, out_dir="."):
+    """Drop entries under `prefixes` (and delete their files) that were not produced by this run."""
+    keep = {manifest_key(p, out_dir) for p in keep}
+    for key in [k for k in manifest if k.startswith(tuple(prefixes)) and k not in keep]:
+        path = os.path.join(out_dir or ".", key)
+        if os.path.exists(path):
+            os.remove(path)
+        del manifest[key]
+
+# -------------------------------
+# Workbooks: reuse unchanged sheets
+# -------------------------------
+def open_workbook(path, sheet_hashes, manifest, out_dir="."):
+    """Return (workbook, titles to rebuild); unchanged sheets are kept as they are on disk.
+
+    The workbook is None when nothing changed at all, so callers can skip it.
+    """
+    from openpyxl import Workbook, load_workbook
+
+    key = manifest_key(path, out_dir)
+    if os.path.exists(path) and manifest.get(key) == content_hash(list(sheet_hashes)) and \
+            all(manifest.get(f"{key}#{t}") == h for t, h in sheet_hashes.items()):
+        return None, []
+    if os.path.exists(path) and key in manifest:
+        wb = load_workbook(path)
+        stale = []
+        for title in wb.sheetnames:
+            # Sheets this export does not produce (added by hand, left by an older run) go too
+            if title not in sheet_hashes or manifest.get(f"{key}#{title}") != sheet_hashes[title]:
+                del wb[title]
+        for title in sheet_hashes:
+            if title not in wb.sheetnames:
+                stale.append(title)
+        return wb, stale
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    return wb, list(sheet_hashes)
+
+def save_workbook(wb, path):
+    """Write to a temporary file and move it into place, so a failed save leaves the old file intact."""
+    tmp = f"{path}.tmp"
+    try:
+        wb.save(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def finish_workbook(wb, path, sheet_hashes, manifest, out_dir=".", writer=None, done=None):
+    """Restore sheet order, save if anything changed and update the manifest.
+
+    With a BackgroundWriter the save is queued; the manifest entries are
+    written (and `done` is called) at writer.join(), once the file is on disk.
+    """
+    if wb is None:
+        return False
+    key = manifest_key(path, out_dir)
+    order = list(sheet_hashes)
+    wb._sheets.sort(key=lambda ws: order.index(ws.title))
+    wb.active = 0
+
+    def commit():
+        for k in [k for k in manifest if k.startswith(key + "#")]:
+            del manifest[k]
+        for title, digest in sheet_hashes.items():
+            manifest[f"{key}#{title}"] = digest
+        manifest[key] = content_hash(order)
+        if done:
+            done()
+
+    if writer is None:
+        save_workbook(wb, path)
+        commit()
+    else:
+        writer.submit(path, save_workbook, wb, path, then=commit)
+    return True
+
+# -------------------------------
+# Background workbook writer
+# -------------------------------
+# Serialising and zipping a workbook is a large share of an export, and it
+# does not depend on anything computed afterwards. Finished workbooks are
+# handed to a small thread pool, the caller moves on to the next layout, and
+# join() is the one place where the caller waits: it runs the success
+# callbacks (manifest updates, messages) on the calling thread in submit
+# order and raises ExportError naming every file that failed. A failed file
+# keeps its previous contents and manifest entries.
+
+class ExportError(RuntimeError):
+    def __init__(self, errors):
+        self.errors = errors  # [(label, exception)]
+        super().__init__("; ".join(f"{label}: {type(e).__name__}: {e}" for label, e in errors))
+
+class BackgroundWriter:
+    def __init__(self, max_workers=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.pool = ThreadPoolExecutor(max_workers or min(4, os.cpu_count() or 1), thread_name_prefix="export")
+        self.pending = []
+
+    def submit(self, label, fn, *args, then=None):
+        self.pending.append((label, self.pool.submit(fn, *args), then))
+
+    def join(self):
+        pending, self.pending = self.pending, []
+        errors = []
+        for label, future, then in pending:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append((label, e))
+                continue
+            if then:
+                then()
+        if errors:
+            raise ExportError(errors) from errors[0][1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            if exc_type is None:
+                self.join()
+        finally:
+            # On an exception in the body the queued writes still finish, but nothing is committed
+            self.pool.shutdown(wait=True)
+        return False
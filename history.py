@@ -0,0 +1,222 @@
+import argparse
+import os
+import sqlite3
+from datetime import date, datetime
+
+from export_cache import content_hash
+from names import name_key
+from schedule_io import flatten_clinics, flatten_lectures, has_time, load_json, time_to_minutes
+
+# -------------------------------
+# Multi-term schedule history (SQLite)
+# -------------------------------
+# Every fetch (clinic + lecture sessions) and every worker assignment is
+# stored as a run tagged with its term and faculty (b). A run whose content
+# hash matches the latest run of the same term, kind and faculty is not
+# stored again. Each run lands with one executemany inside one transaction.
+# The latest_* views always show the newest run per term and faculty, which
+# is what the queries and exports use. Instructor and course are stored as
+# spelled and as names.name_key, and the queries match on the key, so
+# spelling variants of one name are one instructor or course.
+
+DB_NAME = "schedule_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL,
+    kind TEXT NOT NULL,            -- 'sessions' or 'assignment'
+    b INTEGER,
+    created_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    term TEXT NOT NULL,
+    type TEXT NOT NULL,            -- 'clinic' or 'lecture'
+    day TEXT,
+    from_time TEXT,
+    to_time TEXT,
+    minutes INTEGER,
+    course TEXT,
+    room TEXT,
+    location TEXT,
+    instructor TEXT,
+    instructor_key TEXT,
+    course_key TEXT
+);
+CREATE TABLE IF NOT EXISTS worker_slots (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    term TEXT NOT NULL,
+    worker INTEGER NOT NULL,
+    day TEXT,
+    from_time TEXT,
+    to_time TEXT,
+    minutes INTEGER,
+    course TEXT,
+    location TEXT
+);
+"""
+
+# Indexes and views come after the key columns exist (older databases get them added first)
+INDEXES = """
+DROP INDEX IF EXISTS idx_runs_term;
+CREATE INDEX IF NOT EXISTS idx_runs_term_b ON runs(term, kind, b, id);
+CREATE INDEX IF NOT EXISTS idx_sessions_run ON sessions(run_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_term_day ON sessions(term, day);
+DROP INDEX IF EXISTS idx_sessions_instructor;
+DROP INDEX IF EXISTS idx_sessions_course;
+CREATE INDEX IF NOT EXISTS idx_sessions_instructor_key ON sessions(instructor_key, term);
+CREATE INDEX IF NOT EXISTS idx_sessions_room ON sessions(room, term);
+CREATE INDEX IF NOT EXISTS idx_sessions_course_key ON sessions(course_key, term);
+CREATE INDEX IF NOT EXISTS idx_worker_slots_run ON worker_slots(run_id);
+CREATE INDEX IF NOT EXISTS idx_worker_slots_term_worker ON worker_slots(term, worker);
+
+DROP VIEW IF EXISTS latest_runs;  -- older databases grouped by term and kind only
+CREATE VIEW latest_runs AS
+    SELECT MAX(id) AS id, term, kind, b FROM runs GROUP BY term, kind, b;
+CREATE VIEW IF NOT EXISTS latest_sessions AS
+    SELECT s.* FROM sessions s JOIN latest_runs r ON s.run_id = r.id;
+CREATE VIEW IF NOT EXISTS latest_worker_slots AS
+    SELECT w.* FROM worker_slots w JOIN latest_runs r ON w.run_id = r.id;
+"""
+
+def default_term(today=None):
+    """Academic term label, e.g. 2025/2026-1 (Sep-Jan), 2025/2026-2 (Feb-Jun), 2025/2026-S (Jul-Aug)."""
+    today = today or date.today()
+    year = today.year if today.month >= 9 else today.year - 1
+    semester = "1" if today.month >= 9 or today.month == 1 else ("2" if today.month <= 6 else "S")
+    return f"{year}/{year + 1}-{semester}"
+
+def connect(path=DB_NAME):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.create_function("name_key", 1, name_key, deterministic=True)
+    conn.executescript(SCHEMA)
+    add_key_columns(conn)
+    conn.executescript(INDEXES)
+    return conn
+
+def add_key_columns(conn):
+    """Databases from before the *_key columns get them, filled from the stored names."""
+    have = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+    for column in ["instructor", "course"]:
+        if f"{column}_key" not in have:
+            with conn:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {column}_key TEXT")
+                conn.execute(f"UPDATE sessions SET {column}_key = name_key({column})")
+
+def minutes(s):
+    return time_to_minutes(s["To"]) - time_to_minutes(s["From"]) if has_time(s) else None
+
+def _new_run(conn, term, kind, b, digest):
+    latest = conn.execute("SELECT content_hash FROM runs WHERE term = ? AND kind = ? AND b IS ? "
+                          "ORDER BY id DESC LIMIT 1", (term, kind, b)).fetchone()
+    if latest and latest[0] == digest:
+        return None
+    cur = conn.execute("INSERT INTO runs (term, kind, b, created_at, content_hash) VALUES (?, ?, ?, ?, ?)",
+                       (term, kind, b, datetime.now().isoformat(timespec="seconds"), digest))
+    return cur.lastrowid
+
+def ingest_sessions(conn, term, sessions, b=None):
+    """Store one fetch; returns the number of rows written (0 when unchanged since the last run)."""
+    with conn:
+        run_id = _new_run(conn, term, "sessions", b, content_hash(sessions))
+        if run_id is None:
+            return 0
+        conn.executemany(
+            "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, term, s.get("Type", ""), s.get("Day"), s.get("From"), s.get("To"), minutes(s),
+              s.get("Course", ""), s.get("Room", ""), s.get("Location", ""), s.get("Instructor", ""),
+              name_key(s.get("Instructor")), name_key(s.get("Course")))
+             for s in sessions])
+    return len(sessions)
+
+def ingest_assignment(conn, term, assigned_schedule, b=None):
+    """Store one worker assignment (day -> location -> sessions with Workers)."""
+    slots = [(w, s) for s in flatten_clinics(assigned_schedule) for w in s.get("Workers", []) if w is not None]
+    with conn:
+        run_id = _new_run(conn, term, "assignment", b, content_hash(assigned_schedule))
+        if run_id is None:
+            return 0
+        conn.executemany(
+            "INSERT INTO worker_slots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id, term, w, s["Day"], s.get("From"), s.get("To"), minutes(s), s.get("Course", ""),
+              s.get("Location", "")) for w, s in slots])
+    return len(slots)
+
+# -------------------------------
+# Queries
+# -------------------------------
+QUERIES = {
+    "terms": ("SELECT r.term, r.kind, r.b, COUNT(*) AS runs, MAX(r.created_at) AS last_run "
+              "FROM runs r GROUP BY r.term, r.kind, r.b ORDER BY r.term, r.kind, r.b", ()),
+    "instructor": ("SELECT term, type, MIN(course) AS course, COUNT(*) AS sessions, SUM(minutes) / 60.0 AS hours "
+                   "FROM latest_sessions WHERE instructor_key = name_key(?) GROUP BY term, type, course_key "
+                   "ORDER BY term, course", ("instructor",)),
+    "rooms": ("SELECT room, term, COUNT(*) AS sessions, SUM(minutes) / 60.0 AS hours "
+              "FROM latest_sessions WHERE room != '' GROUP BY room, term ORDER BY room, term", ()),
+    "room": ("SELECT term, day, COUNT(*) AS sessions, SUM(minutes) / 60.0 AS hours "
+             "FROM latest_sessions WHERE room = ? GROUP BY term, day ORDER BY term, day", ("room",)),
+    "course": ("SELECT term, day, from_time, to_time, room, instructor FROM latest_sessions "
+               "WHERE course_key = name_key(?) ORDER BY term, day, from_time", ("course",)),
+    "workers": ("SELECT term, worker, COUNT(*) AS slots, SUM(minutes) / 60.0 AS hours "
+                "FROM latest_worker_slots GROUP BY term, worker ORDER BY term, worker", ()),
+    "term": ("SELECT type, day, from_time, to_time, course, room, location, instructor FROM latest_sessions "
+             "WHERE term = ? ORDER BY type, day, from_time", ("term",)),
+}
+
+def query(conn, name, **params):
+    """(headers, rows) for one of QUERIES."""
+    sql, names = QUERIES[name]
+    cur = conn.execute(sql, [params[n] for n in names])
+    return [d[0] for d in cur.description], cur.fetchall()
+
+def export_query(headers, rows, path, title="History"):
+    from openpyxl import Workbook
+
+    from conflict_engine import style_sheet
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = title[:31]
+    ws.append(headers)
+    for row in rows:
+        ws.append(list(row))
+    style_sheet(ws)
+    wb.save(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-term schedule history store")
+    parser.add_argument("--db", default=DB_NAME)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="store the current clinic / lecture JSON files as a term")
+    ingest.add_argument("--term", default=default_term())
+    ingest.add_argument("--clinics", default="assigned_schedule_updated.json")
+    ingest.add_argument("--lectures", default="other_schedule.json")
+
+    for name, (_, params) in QUERIES.items():
+        q = sub.add_parser(name, help=f"query: {name}")
+        for p in params:
+            q.add_argument(p)
+        q.add_argument("--out", help="write the result to this .xlsx instead of printing it")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.command == "ingest":
+        sessions = flatten_clinics(load_json(args.clinics))
+        if os.path.exists(args.lectures):
+            sessions += flatten_lectures(load_json(args.lectures))
+        n = ingest_sessions(conn, args.term, sessions)
+        print(f"✅ {n} sessions stored for {args.term}" if n else f"✅ {args.term} is unchanged since the last run")
+    else:
+        headers, rows = query(conn, args.command, **{p: getattr(args, p) for p in QUERIES[args.command][1]})
+        if args.out:
+            export_query(headers, rows, args.out, args.command)
+            print(f"✅ {len(rows)} rows saved to {args.out}")
+        else:
+            print("\t".join(headers))
+            for row in rows:
+                print("\t".join("" if v is None else str(v) for v in row))
@@ -0,0 +1,90 @@
+import argparse
+
+from conflict_engine import style_sheet
+from names import group_by_name
+from schedule_io import canonical_location, day_sort_key, expand_days, has_time, load_sessions, time_to_minutes
+
+# -------------------------------
+# Instructor double-booking and campus travel check
+# -------------------------------
+# Clinics and lectures are merged into one sorted interval list per
+# instructor. A single pass keeps the session that ends latest so far:
+# starting before it ends is a double booking, starting on another campus
+# less than the travel time after it is an infeasible change of campus.
+
+TRAVEL_MINUTES = 30
+REPORT_HEADERS = [
+    "Instructor", "Day", "Issue", "Gap (min)",
+    "Course 1", "Type 1", "Location 1", "From 1", "To 1",
+    "Course 2", "Type 2", "Location 2", "From 2", "To 2",
+]
+
+def travel_time(loc_a, loc_b, travel_minutes=TRAVEL_MINUTES, travel=None):
+    if not loc_a or not loc_b or loc_a == loc_b:
+        return 0
+    if travel:
+        return travel.get((loc_a, loc_b), travel.get((loc_b, loc_a), travel_minutes))
+    return travel_minutes
+
+def instructor_intervals(sessions):
+    """instructor -> [(day order, start, end, location, session)] sorted by day and start.
+
+    Spellings of the same name (names.name_key) share one list; multi-day
+    sessions appear once per weekday.
+    """
+    per_instructor = group_by_name(filter(has_time, expand_days(sessions)), lambda s: s.get("Instructor"), skip_empty=True)
+    for instr, group in per_instructor.items():
+        per_instructor[instr] = sorted(
+            ((day_sort_key(s["Day"]), time_to_minutes(s["From"]), time_to_minutes(s["To"]),
+              canonical_location(s.get("Location")), s) for s in group),
+            key=lambda x: (x[0], x[1], x[2]))
+    return per_instructor
+
+def check_instructors(sessions, travel_minutes=TRAVEL_MINUTES, travel=None):
+    issues = []
+    for instr, intervals in instructor_intervals(sessions).items():
+        latest = None  # interval with the latest end so far on the current day
+        for item in intervals:
+            day, start, end, loc, s = item
+            if latest is not None and latest[0] == day:
+                _, l_start, l_end, l_loc, l_s = latest
+                gap = start - l_end
+                issue = None
+                if gap < 0:
+                    issue = "overlap"
+                elif gap < travel_time(l_loc, loc, travel_minutes, travel):
+                    issue = "travel"
+                if issue:
+                    issues.append({"Instructor": instr, "Day": s["Day"], "Issue": issue, "Gap": gap,
+                                   "First": l_s, "Second": s})
+            if latest is None or latest[0] != day or end > latest[2]:
+                latest = item
+    return issues
+
+def write_instructor_sheet(ws, issues):
+    ws.append(REPORT_HEADERS)
+    for i in issues:
+        a, b = i["First"], i["Second"]
+        ws.append([
+            i["Instructor"], i["Day"], i["Issue"], i["Gap"],
+            a["Course"], a.get("Type", ""), a.get("Location", ""), a["From"], a["To"],
+            b["Course"], b.get("Type", ""), b.get("Location", ""), b["From"], b["To"],
+        ])
+    style_sheet(ws)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instructor double-booking and campus travel check")
+    parser.add_argument("--clinics", default="assigned_schedule_updated.json")
+    parser.add_argument("--lectures", default="other_schedule.json")
+    parser.add_argument("--travel-minutes", type=int, default=TRAVEL_MINUTES)
+    parser.add_argument("--out", default="instructor_conflicts.xlsx")
+    args = parser.parse_args()
+
+    from openpyxl import Workbook
+
+    issues = check_instructors(load_sessions(args.clinics, args.lectures), args.travel_minutes)
+    wb = Workbook()
+    wb.active.title = "Instructor Conflicts"
+    write_instructor_sheet(wb.active, issues)
+    wb.save(args.out)
+    print(f"✅ {len(issues)} instructor conflicts saved to {args.out}")
@@ -1,8 +1,11 @@
 import pandas as pd
 import json
 
-# Load Excel
-df = pd.read_excel("x.xlsx", sheet_name="Sheet1")
+from excel_cache import read_excel
+
+# Load Excel (streamed once, then served from the column cache). Every column
+# is read: the keyword filter below scans the whole row, prerequisites included
+df = read_excel("x.xlsx", "Sheet1")
 
 # Keywords to exclude (clinic/practical/lab)
 exclude_keywords = ["عيادة", "عملي", "مختبر"]
@@ -0,0 +1,100 @@
+import hashlib
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
+
+# -------------------------------
+# Arabic name normalisation
+# -------------------------------
+# The registrar spells the same instructor / course several ways: أ/إ/آ/ا,
+# ة/ه, ى/ي, stray tashkeel or tatweel, doubled or non-breaking spaces, and a
+# few placeholders for "nobody". name_key() folds all of them to one
+# canonical key; it is memoised (each distinct raw string is folded once) and
+# interned, so grouping compares keys by identity in the common case.
+# Placeholders fold to "" so callers can skip them with a plain truthiness
+# test. Display labels stay the real spelling: the most frequent variant of
+# each key, ties broken alphabetically so the label is stable across runs.
+
+PLACEHOLDERS = {"", "لم يحدد", "غير محدد"}
+UNASSIGNED = "لم يحدد"
+
+ARABIC_FOLD = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    "ـ": None,  # tatweel
+    "\xa0": " ", "\u200e": None, "\u200f": None,  # nbsp, direction marks
+})
+DIACRITICS_RE = re.compile("[\u064b-\u0652\u0670]")  # tashkeel, superscript alef
+SPACE_RE = re.compile(r"\s+")
+
+def clean_name(name):
+    """Raw spelling with whitespace collapsed; None / NaN -> ""."""
+    if name is None or name != name:
+        return ""
+    return SPACE_RE.sub(" ", str(name).replace("\xa0", " ")).strip()
+
+def _fold(name):
+    return SPACE_RE.sub(" ", DIACRITICS_RE.sub("", clean_name(name).translate(ARABIC_FOLD))).strip()
+
+PLACEHOLDER_KEYS = {_fold(p) for p in PLACEHOLDERS}
+
+@lru_cache(maxsize=None)
+def _key(name):
+    key = _fold(name)
+    return "" if key in PLACEHOLDER_KEYS else sys.intern(key)
+
+def name_key(name):
+    """Canonical, interned grouping key; "" for empty or placeholder names."""
+    if name is None or name != name:  # None / NaN
+        return ""
+    return _key(name if isinstance(name, str) else str(name))
+
+def display_name(spellings):
+    """Most frequent spelling in a Counter of clean names (alphabetical on ties)."""
+    return min(spellings.items(), key=lambda kv: (-kv[1], kv[0]))[0]
+
+def group_by_name(items, name_of, skip_empty=False):
+    """{display name: [items]} with spellings of the same name merged, in first-seen order.
+
+    Placeholder names are grouped under UNASSIGNED, or dropped with skip_empty.
+    """
+    groups, spellings = {}, {}
+    for item in items:
+        raw = name_of(item)
+        key = name_key(raw)
+        if not key and skip_empty:
+            continue
+        groups.setdefault(key, []).append(item)
+        spellings.setdefault(key, Counter())[clean_name(raw) if key else UNASSIGNED] += 1
+    return {display_name(spellings[key]): entries for key, entries in groups.items()}
+
+# -------------------------------
+# Excel sheet titles
+# -------------------------------
+# At most 31 characters, none of []:*?/\ and unique ignoring case. A name
+# that fits is used as-is; a longer one is cut and suffixed with a short hash
+# of its key, so its title does not depend on which other names are present.
+SHEET_TITLE_MAX = 31
+INVALID_SHEET_CHARS_RE = re.compile(r"[\[\]:*?/\\]")
+
+def sheet_title(name, digits=0, limit=SHEET_TITLE_MAX):
+    """Title for one name; with digits > 0 (or when too long) it ends in ~<hash of the key>."""
+    title = INVALID_SHEET_CHARS_RE.sub("-", clean_name(name)).strip("'") or UNASSIGNED
+    if len(title) > limit:
+        digits = max(digits, 4)
+    if not digits:
+        return title
+    suffix = hashlib.sha1((name_key(name) or title).encode("utf-8")).hexdigest()[:digits]
+    return f"{title[:limit - digits - 1].rstrip()}~{suffix}"
+
+def sheet_titles(names):
+    """{name: unique sheet title}, stable for a given name."""
+    titles, used = {}, set()
+    for name in sorted(names, key=lambda n: (len(clean_name(n)) > SHEET_TITLE_MAX, clean_name(n))):
+        title, digits = sheet_title(name), 4
+        while title.casefold() in used:
+            title, digits = sheet_title(name, digits), digits + 1
+        used.add(title.casefold())
+        titles[name] = title
+    return {name: titles[name] for name in names}
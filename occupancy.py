@@ -0,0 +1,157 @@
+import argparse
+
+import numpy as np
+
+from export_cache import save_workbook
+from schedule_io import canonical_location, day_sort_key, expand_days, has_time, load_sessions, time_to_minutes
+from time_grid import build_time_grid, grid_labels
+
+# -------------------------------
+# Room / location occupancy tensor
+# -------------------------------
+# tensor[k, d, t] = number of sessions using key k (a room or a campus) on
+# day d during grid slot t. Sessions are painted with a difference array:
+# +1 at the first slot, -1 after the last, then one cumsum along the slot
+# axis, so building the whole tensor is a handful of NumPy calls.
+
+class Occupancy:
+    def __init__(self, tensor, keys, days, grid, locations=None):
+        self.tensor = tensor
+        self.keys = keys
+        self.days = days
+        self.grid = grid
+        self.locations = locations or {}
+        self.key_index = {k: i for i, k in enumerate(keys)}
+        self.day_index = {d: i for i, d in enumerate(days)}
+
+    def slot_range(self, start_time, end_time):
+        start = (time_to_minutes(start_time) - self.grid.start) // self.grid.step
+        end = -(-(time_to_minutes(end_time) - self.grid.start) // self.grid.step)
+        return slice(max(start, 0), max(min(end, self.grid.size), 0))
+
+    def busy(self, key, day, start_time, end_time):
+        if key not in self.key_index or day not in self.day_index:
+            return False
+        window = self.tensor[self.key_index[key], self.day_index[day], self.slot_range(start_time, end_time)]
+        return bool(window.any())
+
+    def free_keys(self, day, start_time, end_time, location=None):
+        if day not in self.day_index:
+            keys = self.keys
+        else:
+            window = self.tensor[:, self.day_index[day], self.slot_range(start_time, end_time)]
+            keys = [self.keys[i] for i in np.flatnonzero(~window.any(axis=1))]
+        if location is not None:
+            location = canonical_location(location)
+            keys = [k for k in keys if self.locations.get(k) == location]
+        return keys
+
+    def clashes(self):
+        """(key, day, slot label, count) for every slot booked more than once."""
+        labels = grid_labels(self.grid)
+        return [(self.keys[k], self.days[d], labels[t], int(self.tensor[k, d, t]))
+                for k, d, t in np.argwhere(self.tensor > 1)]
+
+    def utilisation(self):
+        """Share of grid slots in use, per key and day (keys × days)."""
+        if self.grid.size == 0:
+            return np.zeros(self.tensor.shape[:2])
+        return (self.tensor > 0).mean(axis=2)
+
+def build_occupancy(sessions, by="Room", grid=None, days=None):
+    timed = [s for s in expand_days(sessions) if has_time(s)]
+    if by == "Location":
+        key_of = lambda s: canonical_location(s.get("Location"))
+    else:
+        key_of = lambda s: str(s.get(by, "")).strip()
+    timed = [s for s in timed if key_of(s)]
+
+    grid = grid or build_time_grid(timed)
+    days = days or sorted({s["Day"] for s in timed}, key=day_sort_key)
+    keys = sorted({key_of(s) for s in timed})
+    locations = {}
+    for s in timed:
+        locations.setdefault(key_of(s), canonical_location(s.get("Location")))
+
+    key_index = {k: i for i, k in enumerate(keys)}
+    day_index = {d: i for i, d in enumerate(days)}
+    timed = [s for s in timed if s["Day"] in day_index]
+
+    k = np.fromiter((key_index[key_of(s)] for s in timed), dtype=np.intp, count=len(timed))
+    d = np.fromiter((day_index[s["Day"]] for s in timed), dtype=np.intp, count=len(timed))
+    start = np.fromiter((time_to_minutes(s["From"]) for s in timed), dtype=np.int64, count=len(timed))
+    end = np.fromiter((time_to_minutes(s["To"]) for s in timed), dtype=np.int64, count=len(timed))
+
+    first = np.clip((start - grid.start) // grid.step, 0, grid.size)
+    last = np.clip(-((grid.start - end) // grid.step), 0, grid.size)  # ceil division
+
+    diff = np.zeros((len(keys), len(days), grid.size + 1), dtype=np.int32)
+    np.add.at(diff, (k, d, first), 1)
+    np.add.at(diff, (k, d, last), -1)
+    tensor = np.cumsum(diff, axis=2)[:, :, :grid.size]
+    return Occupancy(tensor, keys, days, grid, locations)
+
+# -------------------------------
+# Excel output
+# -------------------------------
+def write_utilisation_sheet(ws, occ, label):
+    util = occ.utilisation()
+    ws.append([label, "Location", "Busy Hours", "Utilisation %"] + [f"{d} %" for d in occ.days])
+    busy_hours = (occ.tensor > 0).sum(axis=(1, 2)) * occ.grid.step / 60
+    overall = util.mean(axis=1) if len(occ.days) else np.zeros(len(occ.keys))
+    for i, key in enumerate(occ.keys):
+        ws.append([key, occ.locations.get(key, ""), round(float(busy_hours[i]), 2), round(float(overall[i]) * 100, 1)]
+                  + [round(float(u) * 100, 1) for u in util[i]])
+    for col in ["A", "B", "C", "D"]:
+        ws.column_dimensions[col].width = 15
+
+def write_heatmap_sheet(ws, occ, label):
+    from openpyxl.formatting.rule import ColorScaleRule
+    from openpyxl.utils import get_column_letter
+
+    ws.append([label, "Day"] + grid_labels(occ.grid))
+    for i, key in enumerate(occ.keys):
+        for j, day in enumerate(occ.days):
+            ws.append([key, day] + occ.tensor[i, j].tolist())
+
+    if occ.grid.size and ws.max_row > 1:
+        cells = f"C2:{get_column_letter(occ.grid.size + 2)}{ws.max_row}"
+        ws.conditional_formatting.add(cells, ColorScaleRule(
+            start_type="num", start_value=0, start_color="FFFFFF",
+            mid_type="num", mid_value=1, mid_color="FFD966",
+            end_type="max", end_color="E06666"))
+    ws.column_dimensions["A"].width = 15
+    for col_idx in range(3, occ.grid.size + 3):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 6
+    ws.freeze_panes = "C2"
+
+def write_occupancy_workbook(sessions, path="occupancy.xlsx", writer=None):
+    """With a BackgroundWriter the save is queued on it instead of done here."""
+    from openpyxl import Workbook
+
+    grid = build_time_grid([s for s in sessions if has_time(s)])
+    rooms = build_occupancy(sessions, "Room", grid)
+    campuses = build_occupancy(sessions, "Location", grid, rooms.days)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Room Utilisation"
+    write_utilisation_sheet(ws, rooms, "Room")
+    write_utilisation_sheet(wb.create_sheet("Location Utilisation"), campuses, "Location")
+    write_heatmap_sheet(wb.create_sheet("Room Heatmap"), rooms, "Room")
+    write_heatmap_sheet(wb.create_sheet("Location Heatmap"), campuses, "Location")
+    if writer is None:
+        wb.save(path)
+    else:
+        writer.submit(path, save_workbook, wb, path, then=lambda: print(f"✅ Occupancy saved to {path}"))
+    return rooms, campuses
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Room and campus occupancy summary and heatmaps")
+    parser.add_argument("--clinics", default="assigned_schedule_updated.json")
+    parser.add_argument("--lectures", default="other_schedule.json")
+    parser.add_argument("--out", default="occupancy.xlsx")
+    args = parser.parse_args()
+
+    rooms, campuses = write_occupancy_workbook(load_sessions(args.clinics, args.lectures), args.out)
+    print(f"✅ Occupancy for {len(rooms.keys)} rooms and {len(campuses.keys)} locations saved to {args.out}")
@@ -0,0 +1,116 @@
+import re
+
+# -------------------------------
+# Registrar "materials" page: fetch and parse
+# -------------------------------
+# requests, bs4 and pandas are imported inside the functions that use them:
+# the packaged app should reach its first prompt without paying for them.
+URL = "https://zajelbs.najah.edu/servlet/materials"
+
+# Identify table by headers
+KEY_HEADERS = [
+    "المساق/ش", "اسم المساق", "س.م", "الأيام", "الساعة",
+    "القاعة", "الحرم", "المتطلبات السابقة", "المدرس", "أرقام مساقات مكافئة"
+]
+
+COLUMNS = [
+    "Image", "Empty1", "المساق/ش", "اسم المساق", "س.م",
+    "الأيام", "الساعة", "القاعة", "الحرم",
+    "المتطلبات السابقة", "المدرس", "أرقام مساقات مكافئة"
+]
+
+def normalize_text(s):
+    if not s:
+        return ""
+    s = str(s).replace("\xa0", " ").replace("&nbsp;", " ")
+    s = re.sub(r"\s+", " ", s)
+    return s.strip()
+
+def is_missing(value):
+    return value is None or value != value  # None or NaN
+
+def normalize_time(time_str):
+    if is_missing(time_str) or str(time_str).strip() == "":
+        return "", ""
+    try:
+        start, end = time_str.split("-")
+        return start.strip(), end.strip()
+    except:
+        return "", ""
+
+def fetch_html(b, url=URL, timeout=60):
+    import requests
+
+    response = requests.post(url, data={"b": b}, timeout=timeout)
+    if response.status_code != 200:
+        raise Exception(f"POST request failed with status code {response.status_code}")
+
+    # Use correct Arabic encoding
+    response.encoding = "windows-1256"
+    return response.text
+
+def fetch_html_if_changed(b, url=URL, etag=None, last_modified=None, timeout=60):
+    """Conditional POST: returns (html or None when the server answers 304, response headers)."""
+    import requests
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = requests.post(url, data={"b": b}, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, response.headers
+    if response.status_code != 200:
+        raise Exception(f"POST request failed with status code {response.status_code}")
+    response.encoding = "windows-1256"
+    return response.text, response.headers
+
+def parse_rows(html_content):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    target_table = None
+    for table in soup.find_all("table"):
+        first_row = table.find("tr")
+        if not first_row:
+            continue
+        cols = [normalize_text(td.get_text()) for td in first_row.find_all("td")]
+        if all(any(kh in c for c in cols) for kh in KEY_HEADERS):
+            target_table = table
+            break
+
+    if target_table is None:
+        raise Exception("Could not find the table with the expected headers")
+
+    # Extract rows
+    rows = []
+    for tr in target_table.find_all("tr")[1:]:
+        cols = tr.find_all("td")
+        if len(cols) == 0:
+            continue
+        rows.append([normalize_text(td.get_text(separator=" ", strip=True)) for td in cols])
+    return rows
+
+def rows_to_records(rows):
+    """Rows as dicts keyed by the table headers, without the two unused leading columns."""
+    names = COLUMNS[2:]
+    return [dict(zip(names, row[2:])) for row in rows if len(row) >= 3]
+
+def rows_to_dataframe(rows):
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    if df.shape[1] >= 12:
+        df.columns = COLUMNS + list(df.columns[12:])
+        df = df.drop(columns=["Image", "Empty1"])  # remove unused columns
+    return df
+
+def fetch_rows(b, url=URL):
+    return parse_rows(fetch_html(b, url))
+
+def fetch_records(b, url=URL):
+    return rows_to_records(fetch_rows(b, url))
+
+def fetch_dataframe(b, url=URL):
+    return rows_to_dataframe(fetch_rows(b, url))
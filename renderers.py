@@ -0,0 +1,261 @@
+import argparse
+import csv
+import hashlib
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from html import escape
+
+from export_cache import content_hash, is_fresh, load_manifest, prune, record, save_manifest
+from names import group_by_name
+from schedule_io import day_sort_key, days_of, expand_days, has_time, load_sessions, time_to_minutes
+
+# -------------------------------
+# Lightweight HTML / CSV / ICS output
+# -------------------------------
+# Static files built straight from the session dicts, no openpyxl involved,
+# so they can be copied to any web server and opened on a phone.
+
+CSV_COLUMNS = ["Day", "Type", "Course", "From", "To", "Room", "Location", "Instructor", "Workers"]
+
+HTML_LAYOUT = 2  # part of every page hash; bump when render_html's output changes
+TERM_START_KEY = "term_start"  # export manifest entry holding the term start of the ICS feeds
+
+# Python weekday() numbers (Monday = 0) for the registrar's day names
+WEEKDAYS = {"سبت": 5, "احد": 6, "اثنين": 0, "ثلاث": 1, "اربعاء": 2, "خميس": 3, "جمعة": 4}
+
+def unique_color(name):
+    h = hashlib.md5(name.encode("utf-8")).hexdigest()
+    r = int(h[0:2],16)//2 + 128
+    g = int(h[2:4],16)//2 + 128
+    b = int(h[4:6],16)//2 + 128
+    return f"{r:02X}{g:02X}{b:02X}"
+
+def safe_name(name):
+    name = re.sub(r'[\\/:*?"<>|]+', "-", str(name).strip())
+    name = re.sub(r"\s+", "_", name)
+    return name or "unnamed"
+
+def file_names(names):
+    """{name: file stem}, unique ignoring case; names that clean to the same stem get -2, -3 ... in sorted order."""
+    stems, used = {}, set()
+    for name in sorted(names, key=str):
+        stem, n = safe_name(name), 1
+        while stem.casefold() in used:
+            n += 1
+            stem = f"{safe_name(name)}-{n}"
+        used.add(stem.casefold())
+        stems[name] = stem
+    return stems
+
+def session_sort_key(s):
+    start = time_to_minutes(s["From"]) if has_time(s) else -1
+    return (day_sort_key(s["Day"]), start, s.get("Course", ""))
+
+def worker_list(s):
+    return [str(w) for w in s.get("Workers", []) if w]
+
+# -------------------------------
+# 1️⃣ Views
+# -------------------------------
+def group_views(sessions):
+    views = {"instructors": {}, "workers": {}, "rooms": {}, "days": {}}
+    for s in sessions:
+        for w in worker_list(s):
+            views["workers"].setdefault(f"Worker {w}", []).append(s)
+        if s.get("Room"):
+            views["rooms"].setdefault(s["Room"], []).append(s)
+        for day in days_of(s["Day"]):
+            views["days"].setdefault(day, []).append(s)
+    views["instructors"] = group_by_name(sessions, lambda s: s.get("Instructor"), skip_empty=True)
+    for groups in views.values():
+        for entries in groups.values():
+            entries.sort(key=session_sort_key)
+    return views
+
+# -------------------------------
+# 2️⃣ HTML
+# -------------------------------
+PAGE = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 0.5em; }}
+table {{ border-collapse: collapse; width: 100%; margin-bottom: 1em; }}
+th, td {{ border: 1px solid #ccc; padding: 0.3em; text-align: center; }}
+h2 {{ margin: 0.6em 0 0.2em; font-size: 1.1em; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+def render_html(title, sessions):
+    parts = []
+    by_day = {}
+    for s in expand_days(sessions):  # a multi-day session is listed under each of its weekdays
+        by_day.setdefault(s["Day"], []).append(s)
+    for day in sorted(by_day, key=day_sort_key):
+        by_day[day].sort(key=session_sort_key)
+        parts.append(f"<h2>{escape(day)}</h2>")
+        parts.append("<table><tr><th>الوقت</th><th>المساق</th><th>القاعة</th><th>المدرس</th><th>Workers</th></tr>")
+        for s in by_day[day]:
+            color = unique_color(s.get("Course", ""))
+            where = " / ".join(x for x in [s.get("Location", ""), s.get("Room", "")] if x)
+            parts.append(
+                f'<tr style="background:#{color}">'
+                f"<td>{escape(s.get('From', ''))}-{escape(s.get('To', ''))}</td>"
+                f"<td>{escape(s.get('Course', ''))}</td>"
+                f"<td>{escape(where)}</td>"
+                f"<td>{escape(s.get('Instructor', ''))}</td>"
+                f"<td>{escape(' / '.join(worker_list(s)))}</td></tr>"
+            )
+        parts.append("</table>")
+    return PAGE.format(title=escape(title), body="\n".join(parts))
+
+def render_index(views, files):
+    parts = []
+    for kind, groups in views.items():
+        parts.append(f"<h2>{escape(kind)}</h2><ul>")
+        for name in sorted(groups):
+            parts.append(f'<li><a href="{kind}/{escape(files[kind][name])}.html">{escape(name)}</a></li>')
+        parts.append("</ul>")
+    return PAGE.format(title="Schedule", body="\n".join(parts))
+
+# -------------------------------
+# 3️⃣ CSV
+# -------------------------------
+def write_csv(sessions, path):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for s in sorted(sessions, key=session_sort_key):
+            row = [s.get(c, "") for c in CSV_COLUMNS[:-1]] + [" / ".join(worker_list(s))]
+            writer.writerow(row)
+
+# -------------------------------
+# 4️⃣ iCalendar
+# -------------------------------
+def ics_escape(text):
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def ics_fold(line):
+    # RFC 5545: lines longer than 75 octets continue with a leading space
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    out, chunk = [], ""
+    for ch in line:
+        limit = 75 if not out else 74
+        if len((chunk + ch).encode("utf-8")) > limit:
+            out.append(chunk)
+            chunk = ""
+        chunk += ch
+    out.append(chunk)
+    return "\r\n ".join(out)
+
+def first_date(day, term_start):
+    offset = (WEEKDAYS[day] - term_start.weekday()) % 7
+    return term_start + timedelta(days=offset)
+
+def render_ics(name, sessions, term_start, weeks=16):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//schedualer//EN",
+             f"X-WR-CALNAME:{ics_escape(name)}"]
+    for s in expand_days(sessions):  # one weekly event per weekday
+        if s["Day"] not in WEEKDAYS or not has_time(s):
+            continue
+        d = first_date(s["Day"], term_start)
+        start = datetime.combine(d, datetime.min.time()) + timedelta(minutes=time_to_minutes(s["From"]))
+        end = datetime.combine(d, datetime.min.time()) + timedelta(minutes=time_to_minutes(s["To"]))
+        key = "|".join([name, s["Day"], s["From"], s["To"], s.get("Course", ""), s.get("Room", "")])
+        uid = hashlib.md5(key.encode("utf-8")).hexdigest()
+        description = f"{s.get('Instructor', '')}\n{' / '.join(worker_list(s))}".strip()
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@schedualer",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}",
+            f"RRULE:FREQ=WEEKLY;COUNT={weeks}",
+            f"SUMMARY:{ics_escape(s.get('Course', ''))}",
+            f"LOCATION:{ics_escape(' / '.join(x for x in [s.get('Location', ''), s.get('Room', '')] if x))}",
+            f"DESCRIPTION:{ics_escape(description)}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(ics_fold(l) for l in lines) + "\r\n"
+
+# -------------------------------
+# 5️⃣ Write everything
+# -------------------------------
+def write_text(path, text, newline=None):
+    with open(path, "w", encoding="utf-8", newline=newline) as f:
+        f.write(text)
+
+def render_all(sessions, out_dir="site", term_start=None, weeks=16, force=False):
+    """Write every view whose content hash changed; returns (written, reused) paths."""
+    manifest = load_manifest(out_dir)
+    # ICS dates hang off the term start. Without an explicit one, the start the site was first
+    # rendered with is kept, so the feeds and their hashes do not move with today's date.
+    stored = manifest.get(TERM_START_KEY)
+    term_start = term_start or (date.fromisoformat(stored) if stored else date.today())
+    if force:
+        manifest = {}
+    manifest[TERM_START_KEY] = term_start.isoformat()
+    views = group_views(sessions)
+    files = {kind: file_names(groups) for kind, groups in views.items()}
+    written, reused = [], []
+
+    def emit(path, digest, write):
+        if is_fresh(manifest, path, digest, out_dir):
+            reused.append(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write(path)
+        record(manifest, path, digest, out_dir)
+        written.append(path)
+
+    for kind, groups in views.items():
+        for name, entries in groups.items():
+            path = os.path.join(out_dir, kind, files[kind][name] + ".html")
+            emit(path, content_hash(PAGE, HTML_LAYOUT, name, entries),
+                 lambda p: write_text(p, render_html(name, entries)))
+
+    for kind in ["instructors", "workers"]:
+        for name, entries in views[kind].items():
+            path = os.path.join(out_dir, "ics", kind, files[kind][name] + ".ics")
+            digest = content_hash("ics", name, entries, term_start, weeks)
+            emit(path, digest, lambda p: write_text(p, render_ics(name, entries, term_start, weeks), newline=""))
+
+    index = {kind: sorted(groups) for kind, groups in views.items()}
+    emit(os.path.join(out_dir, "index.html"), content_hash(PAGE, index),
+         lambda p: write_text(p, render_index(views, files)))
+    emit(os.path.join(out_dir, "schedule.csv"), content_hash(CSV_COLUMNS, sessions),
+         lambda p: write_csv(sessions, p))
+
+    # People, rooms or days that disappeared from the schedule lose their files
+    prune(manifest, written + reused, [kind + "/" for kind in views] + ["ics/"], out_dir)
+    save_manifest(manifest, out_dir)
+    return written, reused
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render static HTML, CSV and ICS schedules")
+    parser.add_argument("--clinics", default="assigned_schedule_updated.json")
+    parser.add_argument("--lectures", default="other_schedule.json")
+    parser.add_argument("--out", default="site")
+    parser.add_argument("--term-start", help="first day of term, YYYY-MM-DD (default: the one last used for --out, else today)")
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--force", action="store_true", help="ignore the export manifest and rewrite everything")
+    args = parser.parse_args()
+
+    term_start = datetime.strptime(args.term_start, "%Y-%m-%d").date() if args.term_start else None
+    sessions = load_sessions(args.clinics, args.lectures)
+    written, reused = render_all(sessions, args.out, term_start, args.weeks, args.force)
+    print(f"✅ {len(written)} files rendered to {args.out}/ ({len(reused)} unchanged)")
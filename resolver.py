@@ -0,0 +1,124 @@
+import argparse
+import os
+import time
+
+from conflict_engine import style_sheet, sweep
+from names import name_key
+from room_index import SLOT_MINUTES, RoomIndex, time_mask
+from schedule_io import canonical_location, load_sessions, minutes_to_time, time_to_minutes
+
+# -------------------------------
+# Room clash resolution suggestions
+# -------------------------------
+# For every room clash the earliest sessions keep the room; each clashing one
+# gets ranked candidate moves: another free room on the same campus at the
+# same time, or the nearest time the same room and the instructor are both
+# free on that day. Accepted moves are written back into the index so two
+# clashing sessions are never sent to the same place.
+
+ROOM_MOVE_COST = 1.0
+TIME_MOVE_COST = 2.0
+REPORT_HEADERS = [
+    "Day", "Room", "Course", "Instructor", "From", "To",
+    "Rank", "Move", "New Room", "New From", "New To", "Disruption",
+]
+
+def room_distance(a, b):
+    """Rough building distance between room codes: characters after the shared prefix."""
+    common = os.path.commonprefix([a, b])
+    return max(len(a), len(b)) - len(common)
+
+def room_candidates(index, s):
+    location = canonical_location(s.get("Location"))
+    room = s["Room"]
+    candidates = []
+    for other in index.free_rooms(s["Day"], s["From"], s["To"], location):
+        if other == room:
+            continue
+        score = ROOM_MOVE_COST + room_distance(room, other) / 10
+        candidates.append({"Move": "room", "New Room": other, "New From": s["From"], "New To": s["To"],
+                           "Disruption": round(score, 2)})
+    return candidates
+
+def time_candidates(index, s, day_start="08:00", day_end="18:00", step=30):
+    start, end = time_to_minutes(s["From"]), time_to_minutes(s["To"])
+    length = end - start
+    busy = index.busy(index.room_busy, s["Room"], s["Day"])
+    busy |= index.busy(index.instructor_busy, name_key(s.get("Instructor")), s["Day"])
+
+    candidates = []
+    lo, hi = time_to_minutes(day_start), time_to_minutes(day_end)
+    mask = time_mask(s["From"], s["To"])
+    for shift in sorted(range(lo - start, hi - length - start + 1, step), key=abs):
+        if shift == 0 or shift % SLOT_MINUTES:
+            continue
+        bits = shift // SLOT_MINUTES
+        moved = mask << bits if bits > 0 else mask >> -bits
+        if busy & moved:
+            continue
+        score = TIME_MOVE_COST + abs(shift) / 60
+        candidates.append({"Move": "time", "New Room": s["Room"], "New From": minutes_to_time(start + shift),
+                           "New To": minutes_to_time(end + shift), "Disruption": round(score, 2)})
+        if len(candidates) >= 3:
+            break
+    return candidates
+
+def resolve(sessions, index=None, max_candidates=3):
+    """Return [(session, ranked candidate moves)] for every session that has to leave its room."""
+    index = index or RoomIndex(sessions)
+    groups, _ = sweep(sessions, "room")
+    suggestions, moved = [], set()
+    for group in groups:
+        # Keep sessions greedily by start time, move only the ones clashing with a kept one
+        to_move, kept_end = [], -1
+        for s in sorted(group["Sessions"], key=lambda s: time_to_minutes(s["From"])):
+            if time_to_minutes(s["From"]) >= kept_end:
+                kept_end = time_to_minutes(s["To"])
+            else:
+                to_move.append(s)
+        for s in to_move:
+            if id(s) in moved:  # a multi-day session can clash on several weekdays
+                continue
+            moved.add(id(s))
+            index.remove(s)
+            candidates = room_candidates(index, s) + time_candidates(index, s)
+            candidates.sort(key=lambda c: c["Disruption"])
+            candidates = candidates[:max_candidates]
+            if candidates:
+                best = candidates[0]
+                index.add(dict(s, Room=best["New Room"], From=best["New From"], To=best["New To"]))
+            else:
+                index.add(s)
+            suggestions.append((s, candidates))
+    return suggestions
+
+def write_moves_sheet(ws, suggestions):
+    ws.append(REPORT_HEADERS)
+    for s, candidates in suggestions:
+        info = [s["Day"], s["Room"], s["Course"], s.get("Instructor", ""), s["From"], s["To"]]
+        if not candidates:
+            ws.append(info + ["", "none", "", "", "", ""])
+        for rank, c in enumerate(candidates, start=1):
+            ws.append(info + [rank, c["Move"], c["New Room"], c["New From"], c["New To"], c["Disruption"]])
+    style_sheet(ws)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suggest room or time moves for room clashes")
+    parser.add_argument("--clinics", default="assigned_schedule_updated.json")
+    parser.add_argument("--lectures", default="other_schedule.json")
+    parser.add_argument("--candidates", type=int, default=3)
+    parser.add_argument("--out", default="suggested_moves.xlsx")
+    args = parser.parse_args()
+
+    from openpyxl import Workbook
+
+    sessions = load_sessions(args.clinics, args.lectures)
+    t0 = time.perf_counter()
+    suggestions = resolve(sessions, max_candidates=args.candidates)
+    elapsed = time.perf_counter() - t0
+
+    wb = Workbook()
+    wb.active.title = "Suggested Moves"
+    write_moves_sheet(wb.active, suggestions)
+    wb.save(args.out)
+    print(f"✅ {len(suggestions)} sessions to move, resolved in {elapsed*1000:.1f} ms, saved to {args.out}")
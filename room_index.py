@@ -0,0 +1,180 @@
+import argparse
+import time
+from collections import Counter
+
+from names import name_key
+from schedule_io import canonical_location, days_of, has_time, load_sessions, minutes_to_time, time_to_minutes
+
+# -------------------------------
+# Free-room / free-slot bitset index
+# -------------------------------
+# Each (room, day) and (instructor, day) keeps a Python int used as a bitset
+# over the day in SLOT_MINUTES slots (bit i = minutes [5i, 5i+5)). "Is this
+# room free?" is one AND, "when are these people all free?" is one OR and a
+# scan of the zero runs. The fixed origin and step mean a new session never
+# forces a re-layout, so changes are applied per key.
+
+SLOT_MINUTES = 5
+
+def span_mask(start_min, end_min):
+    first = start_min // SLOT_MINUTES
+    last = -(-end_min // SLOT_MINUTES)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+def time_mask(start_time, end_time):
+    return span_mask(time_to_minutes(start_time), time_to_minutes(end_time))
+
+def free_runs(busy, window_start, window_end, min_minutes=0):
+    """(from, to) minute ranges inside the window where no bit of `busy` is set."""
+    runs = []
+    first = window_start // SLOT_MINUTES
+    last = -(-window_end // SLOT_MINUTES)
+    run_start = None
+    for i in range(first, last + 1):
+        free = i < last and not (busy >> i) & 1
+        if free and run_start is None:
+            run_start = i
+        elif not free and run_start is not None:
+            if (i - run_start) * SLOT_MINUTES >= min_minutes:
+                runs.append((run_start * SLOT_MINUTES, i * SLOT_MINUTES))
+            run_start = None
+    return runs
+
+def session_key(s):
+    return (s["Day"], s.get("From", ""), s.get("To", ""), s.get("Room", ""), s.get("Course", ""),
+            s.get("Instructor", ""), s.get("Type", ""))
+
+class RoomIndex:
+    def __init__(self, sessions=()):
+        self.room_busy = {}        # (room, day) -> bitset
+        self.instructor_busy = {}  # (instructor, day) -> bitset
+        self.members = {}          # bitset key -> Counter of session keys behind it
+        self.locations = {}        # room -> campus
+        self.sessions = Counter()
+        self.update(sessions)
+
+    # -------- incremental maintenance --------
+    def _index_keys(self, s):
+        keys = []
+        room = str(s.get("Room", "")).strip()
+        instr = name_key(s.get("Instructor"))
+        for day in days_of(s["Day"]):  # one bitset per weekday the session meets
+            if room:
+                keys.append((self.room_busy, (room, day)))
+            if instr:
+                keys.append((self.instructor_busy, (instr, day)))
+        return keys
+
+    def add(self, s):
+        room = str(s.get("Room", "")).strip()
+        if room:
+            self.locations.setdefault(room, canonical_location(s.get("Location")))
+        if not has_time(s):
+            return
+        key = session_key(s)
+        self.sessions[key] += 1
+        mask = time_mask(s["From"], s["To"])
+        for table, k in self._index_keys(s):
+            table[k] = table.get(k, 0) | mask
+            self.members.setdefault(k, Counter())[key] += 1
+
+    def remove(self, s):
+        key = session_key(s)
+        if not has_time(s) or not self.sessions[key]:
+            return
+        self.sessions[key] -= 1
+        if not self.sessions[key]:
+            del self.sessions[key]
+        for table, k in self._index_keys(s):
+            members = self.members[k]
+            members[key] -= 1
+            if not members[key]:
+                del members[key]
+            # Overlapping sessions share bits, so the key is rebuilt from what is left
+            mask = 0
+            for day, start, end, *_ in members:
+                mask |= time_mask(start, end)
+            if mask:
+                table[k] = mask
+            else:
+                del table[k], self.members[k]
+
+    def update(self, sessions):
+        """Bring the index in line with `sessions`, touching only what changed."""
+        wanted = Counter(session_key(s) for s in sessions if has_time(s))
+        by_key = {session_key(s): s for s in sessions}
+        for key, count in (self.sessions - wanted).items():
+            for _ in range(count):
+                self.remove(dict(zip(["Day", "From", "To", "Room", "Course", "Instructor", "Type"], key)))
+        # Campuses are re-read in full: a room that moved campus or left the schedule must not linger
+        self.locations = {}
+        for key, count in (wanted - self.sessions).items():
+            for _ in range(count):
+                self.add(by_key[key])
+        for s in sessions:
+            room = str(s.get("Room", "")).strip()
+            if room:  # rooms without a time still belong to their campus
+                self.locations.setdefault(room, canonical_location(s.get("Location")))
+
+    # -------- queries --------
+    @staticmethod
+    def busy(table, name, day):
+        """Busy bits of `name` on every weekday `day` names (a multi-day field ORs them)."""
+        mask = 0
+        for d in days_of(day):
+            mask |= table.get((name, d), 0)
+        return mask
+
+    def rooms(self, location=None):
+        if location is None:
+            return sorted(self.locations)
+        location = canonical_location(location)
+        return sorted(r for r, loc in self.locations.items() if loc == location)
+
+    def free_rooms(self, day, start_time, end_time, location=None):
+        mask = time_mask(start_time, end_time)
+        return [r for r in self.rooms(location) if not self.busy(self.room_busy, r, day) & mask]
+
+    def room_free(self, room, day, start_time, end_time):
+        return not self.busy(self.room_busy, room, day) & time_mask(start_time, end_time)
+
+    def common_free_slots(self, instructors, day, start_time="08:00", end_time="18:00", min_minutes=30):
+        busy = 0
+        for instr in instructors:
+            busy |= self.busy(self.instructor_busy, name_key(instr), day)
+        runs = free_runs(busy, time_to_minutes(start_time), time_to_minutes(end_time), min_minutes)
+        return [(minutes_to_time(a), minutes_to_time(b)) for a, b in runs]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Free-room and common free-slot queries")
+    parser.add_argument("--clinics", default="assigned_schedule_updated.json")
+    parser.add_argument("--lectures", default="other_schedule.json")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    free = sub.add_parser("free", help="rooms free for a whole time range")
+    free.add_argument("--day", required=True)
+    free.add_argument("--from", dest="start", required=True)
+    free.add_argument("--to", dest="end", required=True)
+    free.add_argument("--location")
+
+    common = sub.add_parser("common", help="slots when all the given instructors are free")
+    common.add_argument("--day", required=True)
+    common.add_argument("--instructors", nargs="+", required=True)
+    common.add_argument("--from", dest="start", default="08:00")
+    common.add_argument("--to", dest="end", default="18:00")
+    common.add_argument("--min", dest="min_minutes", type=int, default=30)
+    args = parser.parse_args()
+
+    index = RoomIndex(load_sessions(args.clinics, args.lectures))
+    t0 = time.perf_counter()
+    if args.command == "free":
+        result = index.free_rooms(args.day, args.start, args.end, args.location)
+    else:
+        result = index.common_free_slots(args.instructors, args.day, args.start, args.end, args.min_minutes)
+    elapsed = (time.perf_counter() - t0) * 1e6
+
+    for item in result:
+        print(" - ".join(item) if isinstance(item, tuple) else item)
+    print(f"✅ {len(result)} results in {elapsed:.0f} µs")
@@ -0,0 +1,295 @@
+import argparse
+import itertools
+import json
+import os
+
+from names import name_key
+from schedule_io import flatten_lectures
+
+# -------------------------------
+# What-if scenarios
+# -------------------------------
+# A Scenario is a shared, never-modified tuple of base sessions plus an
+# overlay {session id: session or None (removed)}. fork() hands the child the
+# same base and the same overlay, so branching is O(1); the first edit on
+# either side copies only the overlay (the changes, not the schedule), and an
+# edit replaces one session dict instead of mutating it. Assignment, coverage,
+# hours and conflicts are evaluated lazily per scenario and a fork reuses its
+# parent's results until it is edited.
+#
+# compare(a, b) lines the two up: totals side by side, sessions added /
+# removed / changed, per-worker hours and conflict groups that appear or go.
+
+CAMPUSES = ["New Campus", "Old Campus", "CELT"]
+DIFF_NAME = "scenario_diff.xlsx"
+
+_ids = itertools.count(1_000_000)  # ids for added sessions, unique across every scenario
+
+def matches(s, match):
+    """Field-by-field match on canonical names, so spelling variants still hit."""
+    return all(name_key(s.get(k)) == name_key(v) for k, v in match.items())
+
+class Scenario:
+    def __init__(self, name, sessions=(), workers=26):
+        self.name = name
+        self.workers = workers
+        self._base = tuple(sessions)
+        self._overlay = {}
+        self._owns_overlay = True
+        self._result = None
+
+    @classmethod
+    def from_schedules(cls, clinics, other_schedule, workers=26, name="base"):
+        """clinics: day -> location -> sessions (ta_sched shape); other_schedule: day -> lectures."""
+        sessions = [dict(s, Day=day, Location=loc, Type="clinic")
+                    for day, locs in clinics.items() for loc, entries in locs.items() for s in entries]
+        return cls(name, sessions + flatten_lectures(other_schedule or {}), workers)
+
+    # -------- branching --------
+    def fork(self, name):
+        child = Scenario.__new__(Scenario)
+        child.name, child.workers = name, self.workers
+        child._base, child._overlay = self._base, self._overlay
+        child._owns_overlay = self._owns_overlay = False
+        child._result = self._result
+        return child
+
+    def _write(self):
+        if not self._owns_overlay:
+            self._overlay = dict(self._overlay)
+            self._owns_overlay = True
+        self._result = None
+
+    # -------- edits --------
+    def get(self, sid):
+        if sid in self._overlay:
+            return self._overlay[sid]
+        return self._base[sid] if isinstance(sid, int) and 0 <= sid < len(self._base) else None
+
+    def items(self):
+        """(id, session) for every live session, base order first, then additions."""
+        overlay = self._overlay
+        for sid, s in enumerate(self._base):
+            s = overlay.get(sid, s)
+            if s is not None:
+                yield sid, s
+        for sid, s in overlay.items():
+            if sid >= len(self._base) and s is not None:
+                yield sid, s
+
+    def sessions(self):
+        return [s for _, s in self.items()]
+
+    def find(self, **match):
+        return [sid for sid, s in self.items() if matches(s, match)]
+
+    def add_session(self, **fields):
+        fields.setdefault("Type", "clinic")
+        self._write()
+        sid = next(_ids)
+        self._overlay[sid] = fields
+        return sid
+
+    def update_session(self, sid, **changes):
+        s = self.get(sid)
+        if s is None:
+            raise KeyError(f"{self.name}: no session {sid}")
+        self._write()
+        self._overlay[sid] = dict(s, **changes)
+
+    def remove_session(self, sid):
+        if self.get(sid) is None:
+            raise KeyError(f"{self.name}: no session {sid}")
+        self._write()
+        self._overlay[sid] = None
+
+    def set_workers(self, workers):
+        if workers != self.workers:
+            self._result = None
+            self.workers = workers
+
+    def apply(self, plan):
+        """Apply one plan entry: {"workers", "add": [...], "update": [{"match", "set"}], "remove": [{"match"}]}."""
+        if "workers" in plan:
+            self.set_workers(plan["workers"])
+        for fields in plan.get("add", []):
+            self.add_session(**fields)
+        for op in plan.get("update", []):
+            sids = self.find(**op["match"])
+            if not sids:
+                print(f"⚠️ {self.name}: no session matches {op['match']}")
+            for sid in sids:
+                self.update_session(sid, **op["set"])
+        for op in plan.get("remove", []):
+            for sid in self.find(**op["match"]):
+                self.remove_session(sid)
+        return self
+
+    # -------- evaluation --------
+    def clinics(self):
+        """Clinic sessions back in day -> location -> list shape, with their ids."""
+        clinics, ids = {}, {}
+        for sid, s in self.items():
+            if s.get("Type") == "clinic":
+                locs = clinics.setdefault(s["Day"], {loc: [] for loc in CAMPUSES})
+                locs.setdefault(s.get("Location", "CELT"), []).append(s)
+                ids[id(s)] = sid
+        return clinics, ids
+
+    def evaluate(self):
+        if self._result is not None:
+            return self._result
+        from conflict_engine import find_conflicts
+        from coverage import build_coverage
+        from ta_sched import assign_slots, required_workers_for, worker_summary
+
+        clinics, ids = self.clinics()
+        assigned = {day: {loc: [] for loc in locs} for day, locs in clinics.items()}
+        staffed = {}
+        for day, loc, s, workers in assign_slots(clinics, self.workers, warn=False):
+            staffed[ids[id(s)]] = tuple(workers)
+            assigned[day][loc].append(dict(s, Workers=workers))
+        sessions = [dict(s, Workers=list(staffed[sid])) if sid in staffed else s for sid, s in self.items()]
+        groups, _ = find_conflicts(sessions)
+        self._result = {
+            "workers": staffed,
+            "coverage": build_coverage(assigned, required_workers_for),
+            "summary": worker_summary(assigned, list(range(1, self.workers + 1))),
+            "conflicts": groups,
+        }
+        return self._result
+
+# -------------------------------
+# Side-by-side diff
+# -------------------------------
+SESSION_FIELDS = ["Type", "Day", "Location", "Course", "From", "To", "Room", "Instructor"]
+TOTALS_HEADERS = ["Metric", "A", "B", "Change"]
+SESSIONS_HEADERS = ["Change"] + SESSION_FIELDS + ["Workers A", "Workers B"]
+HOURS_HEADERS = ["Worker", "Hours A", "Hours B", "Change"]
+CONFLICTS_HEADERS = ["Status", "Type", "Key", "Day", "From", "To", "Sessions"]
+
+def totals(scenario):
+    result = scenario.evaluate()
+    cov = result["coverage"].report()["totals"]
+    hours = result["summary"]["Total Hours"]
+    sessions = scenario.sessions()
+    rows = {
+        "Sessions": len(sessions),
+        "Clinics": sum(1 for s in sessions if s.get("Type") == "clinic"),
+        "Workers": scenario.workers,
+        "Required worker slots": cov["required_slots"],
+        "Assigned worker slots": cov["assigned_slots"],
+        "Missing worker slots": cov["missing_slots"],
+        "Sessions short of workers": cov["unstaffed_sessions"],
+        "Total worker hours": round(float(hours.sum()), 2),
+        "Max worker hours": round(float(hours.max()), 2) if len(hours) else 0,
+    }
+    for group in result["conflicts"]:
+        label = f"{group['Type'].capitalize()} conflicts"
+        rows[label] = rows.get(label, 0) + 1
+    return rows
+
+def conflict_key(g):
+    return (g["Type"], str(g["Key"]), g["Day"], g["From"], g["To"])
+
+def compare(a, b):
+    """Diff of scenario b against scenario a: totals, sessions, hours and conflicts."""
+    ta, tb = totals(a), totals(b)
+    diff = {"names": (a.name, b.name), "totals": [], "sessions": [], "hours": [], "conflicts": []}
+    for metric in list(ta) + [m for m in tb if m not in ta]:
+        va, vb = ta.get(metric, 0), tb.get(metric, 0)
+        diff["totals"].append([metric, va, vb, round(vb - va, 2)])
+
+    ra, rb = a.evaluate(), b.evaluate()
+    sa, sb = dict(a.items()), dict(b.items())
+    for sid in list(sa) + [sid for sid in sb if sid not in sa]:
+        old, new = sa.get(sid), sb.get(sid)
+        wa, wb = ra["workers"].get(sid), rb["workers"].get(sid)
+        if old is new and wa == wb:
+            continue  # shared, untouched session
+        if old is None:
+            change, fields = "added", [new.get(f, "") for f in SESSION_FIELDS]
+        elif new is None:
+            change, fields = "removed", [old.get(f, "") for f in SESSION_FIELDS]
+        else:
+            moved = [f for f in SESSION_FIELDS if old.get(f, "") != new.get(f, "")]
+            if not moved and wa == wb:
+                continue
+            change = "changed" if moved else "restaffed"
+            fields = [f"{old.get(f, '')} → {new.get(f, '')}" if f in moved else new.get(f, "") for f in SESSION_FIELDS]
+        staff = lambda w: " / ".join(str(x) for x in w if x) if w else ""
+        diff["sessions"].append([change] + fields + [staff(wa), staff(wb)])
+
+    hours_a, hours_b = ra["summary"]["Total Hours"], rb["summary"]["Total Hours"]
+    for w in sorted(set(hours_a.index) | set(hours_b.index)):
+        ha, hb = float(hours_a.get(w, 0)), float(hours_b.get(w, 0))
+        if ha != hb:
+            diff["hours"].append([int(w), ha, hb, round(hb - ha, 2)])
+
+    ga = {conflict_key(g): g for g in ra["conflicts"]}
+    gb = {conflict_key(g): g for g in rb["conflicts"]}
+    for status, keys, groups in [("new", gb.keys() - ga.keys(), gb), ("resolved", ga.keys() - gb.keys(), ga)]:
+        for key in sorted(keys):
+            courses = " | ".join(s.get("Course", "") for s in groups[key]["Sessions"])
+            diff["conflicts"].append([status, *key, courses])
+    return diff
+
+def write_diff(diffs, path=DIFF_NAME):
+    """One sheet per section; each row starts with the comparison it belongs to."""
+    from openpyxl import Workbook
+
+    from conflict_engine import style_sheet
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    for section, headers in [("Totals", TOTALS_HEADERS), ("Sessions", SESSIONS_HEADERS),
+                             ("Hours", HOURS_HEADERS), ("Conflicts", CONFLICTS_HEADERS)]:
+        ws = wb.create_sheet(section)
+        ws.append(["Comparison"] + headers)
+        for diff in diffs:
+            label = "{} vs {}".format(*diff["names"])
+            for row in diff[section.lower()]:
+                ws.append([label] + row)
+        style_sheet(ws)
+    wb.save(path)
+
+def run_plan(base, plan):
+    """Build every scenario in the plan (each forks "from", default the base) and diff it against its parent."""
+    scenarios = {base.name: base}
+    diffs = []
+    for entry in plan.get("scenarios", []):
+        parent = scenarios[entry.get("from", base.name)]
+        scenario = parent.fork(entry["name"]).apply(entry)
+        scenarios[scenario.name] = scenario
+        diffs.append(compare(parent, scenario))
+    return scenarios, diffs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare what-if schedule scenarios")
+    parser.add_argument("plan", help='JSON: {"scenarios": [{"name", "from", "workers", "add", "update", "remove"}]}')
+    parser.add_argument("--config", help="schedualer JSON config (registrar page, workers ...)")
+    parser.add_argument("--b", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--out-dir", dest="out_dir")
+    parser.add_argument("--out", default=DIFF_NAME)
+    args = parser.parse_args()
+
+    import schedualer
+
+    cfg = schedualer.load_config(args.config)
+    cfg.update({k: v for k, v in vars(args).items() if k in cfg and v is not None})
+    cfg["history_db"] = None
+    os.makedirs(cfg["out_dir"], exist_ok=True)
+    data = schedualer.run(["classify"], cfg)
+    with open(args.plan, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+
+    base = Scenario.from_schedules(data.clinics, data.other_schedule, cfg["workers"])
+    scenarios, diffs = run_plan(base, plan)
+    for diff in diffs:
+        print(f"— {diff['names'][0]} vs {diff['names'][1]}")
+        for metric, a, b, change in diff["totals"]:
+            if change:
+                print(f"  {metric}: {a} → {b} ({change:+g})")
+    write_diff(diffs, args.out)
+    print(f"✅ {len(diffs)} scenario comparisons saved to {args.out}")
@@ -1,8 +1,10 @@
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Alignment
 import hashlib
+from openpyxl.utils import get_column_letter
+from time_grid import build_time_grid, grid_labels, slot_span
 
 # -------------------------------
 # 1️⃣ Load JSON schedule
@@ -35,18 +37,8 @@ def normalize_times(from_str, to_str):
         from_time, to_time = to_time, from_time
     return from_time.strftime(fmt), to_time.strftime(fmt)
 
-def create_time_grid(start="08:00", end="18:00", step_minutes=30):
-    fmt = "%H:%M"
-    t_start = datetime.strptime(start, fmt)
-    t_end = datetime.strptime(end, fmt)
-    times = []
-    while t_start < t_end:
-        times.append(t_start.strftime(fmt))
-        t_start += timedelta(minutes=step_minutes)
-    return times
-
-time_grid = create_time_grid()
-time_to_col = {t: idx+2 for idx, t in enumerate(time_grid)}  # columns start at B
+# Columns follow the sessions: GCD step, spanning only the scheduled hours
+time_grid = build_time_grid([s for locs in schedule.values() for lst in locs.values() for s in lst])
 
 # -------------------------------
 # 4️⃣ Initialize workbook
@@ -57,14 +49,13 @@ ws.title = "Clinics Schedule"
 
 # Column widths
 ws.column_dimensions["A"].width = 20
-for i in range(len(time_grid)):
-    col_letter = chr(66 + i) if i < 25 else f"A{i-25+1}"  # B..Z, then AA, AB...
-    ws.column_dimensions[col_letter].width = 15
+for i in range(time_grid.size):
+    ws.column_dimensions[get_column_letter(i + 2)].width = 15
 
 # Write top time labels
 row_idx = 1
-for t, col in time_to_col.items():
-    ws.cell(row=row_idx, column=col, value=t)
+for idx, t in enumerate(grid_labels(time_grid)):
+    ws.cell(row=row_idx, column=idx + 2, value=t)  # columns start at B
 row_idx += 1
 
 # -------------------------------
@@ -73,7 +64,7 @@ row_idx += 1
 for day, locations in schedule.items():
     # Day header
     ws.cell(row=row_idx, column=1, value=day)
-    ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=len(time_grid)+1)
+    ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=time_grid.size+1)
     ws.cell(row=row_idx, column=1).alignment = Alignment(horizontal="center", vertical="center")
     row_idx += 1
 
@@ -108,12 +99,14 @@ for day, locations in schedule.items():
 
             for s in sessions:
                 # Find start and end columns
-                start_col = min([col for t, col in time_to_col.items() if t >= s["From"]], default=2)
-                end_col = max([col for t, col in time_to_col.items() if t < s["To"]], default=start_col)
+                span = slot_span(time_grid, s["From"], s["To"])
+                if span is None:
+                    continue
+                start_col, end_col = span[0] + 2, span[1] + 2
 
                 # Merge cells for this session in the same row
                 ws.merge_cells(start_row=this_row, start_column=start_col, end_row=this_row, end_column=end_col)
-                clinic_text = f"{course_name}\n{' / '.join([str(w) for w in s['Workers'] if w])}\n{s['Instructor']}\n{s['From']}-{s["To"]}"
+                clinic_text = f"{course_name}\n{' / '.join([str(w) for w in s['Workers'] if w])}\n{s['Instructor']}\n{s['From']}-{s['To']}"
                 ws.cell(row=this_row, column=start_col, value=clinic_text)
                 ws.cell(row=this_row, column=start_col).alignment = Alignment(
                     horizontal="center", vertical="center", wrap_text=True
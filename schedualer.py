@@ -0,0 +1,345 @@
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+
+# -------------------------------
+# schedualer: one command for the whole pipeline
+# -------------------------------
+# fetch -> classify -> assign -> export -> conflicts
+#
+# Every stage reads and writes one in-process Dataset, so the registrar is
+# fetched once and each later stage reuses what the earlier ones built.
+# Running a single stage pulls in the stages it depends on. Parameters come
+# from flags or a JSON config file (flags win), never from input().
+
+STAGES = ["fetch", "classify", "assign", "export", "conflicts"]
+EXPORTS = ["master", "ta", "site", "occupancy"]
+DEPENDS = {"fetch": [], "classify": ["fetch"], "assign": ["classify"],
+           "export": ["classify"], "conflicts": ["classify"]}
+DEFAULTS = {
+    "b": 10761,
+    "workers": 26,
+    "out_dir": ".",
+    "raw": None,
+    "clinics_json": "assigned_schedule_updated.json",
+    "lectures_json": "other_schedule.json",
+    "ta_file": "Scheduale.xlsx",
+    "conflicts_file": "schedule_conflicts.xlsx",
+    "occupancy_file": "occupancy.xlsx",
+    "site_dir": "site",
+    "exports": ["master", "ta"],
+    "travel_minutes": 30,
+    "location_capacity": None,              # {campus: max parallel sessions}; null skips the campus check
+    "term_start": None,
+    "weeks": 16,
+    "stages": STAGES,
+    "profile": None,
+    "term": None,                           # defaults to the current academic term
+    "history_db": "schedule_history.sqlite",  # null in the config turns history off
+    "faculties": [],
+    "jobs": None,
+}
+
+class Dataset:
+    def __init__(self):
+        self.records = None            # registrar rows as dicts
+        self.df = None                 # registrar table
+        self.assigned_schedule = None  # clinics, day -> list (master.py shape)
+        self.other_schedule = None     # lectures, day -> list
+        self.clinics = None            # clinics, day -> location -> list (ta_sched.py shape)
+        self.ta_assigned = None        # clinics with Workers
+        self.workers = None
+        self.done = []
+        self.timings = {}              # stage -> seconds
+
+    def sessions(self):
+        """Flat clinic + lecture sessions; clinics carry Workers once assignment has run."""
+        from schedule_io import flatten_clinics, flatten_lectures
+
+        clinics = self.ta_assigned if self.ta_assigned is not None else self.assigned_schedule
+        return flatten_clinics(clinics) + flatten_lectures(self.other_schedule)
+
+def out_path(cfg, name):
+    return os.path.join(cfg["out_dir"], name)
+
+def save_json(schedule, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schedule, f, ensure_ascii=False, indent=4)
+
+def record_history(cfg, kind, payload):
+    if not cfg["history_db"]:
+        return
+    import history
+
+    term = cfg["term"] or history.default_term()
+    conn = history.connect(out_path(cfg, cfg["history_db"]))
+    try:
+        if kind == "sessions":
+            n = history.ingest_sessions(conn, term, payload, cfg["b"])
+        else:
+            n = history.ingest_assignment(conn, term, payload, cfg["b"])
+    finally:
+        conn.close()
+    if n:
+        print(f"✅ {n} {'sessions' if kind == 'sessions' else 'worker slots'} stored in history for {term}")
+
+# -------------------------------
+# Stages
+# -------------------------------
+def stage_fetch(data, cfg):
+    from registrar import fetch_rows, rows_to_dataframe, rows_to_records
+
+    rows = fetch_rows(cfg["b"])
+    data.records = rows_to_records(rows)
+    data.df = rows_to_dataframe(rows)
+    if cfg["raw"]:
+        data.df.to_csv(out_path(cfg, cfg["raw"]), index=False, encoding="utf-8-sig")
+    print(f"✅ Fetched {len(data.df)} registrar rows for b={cfg['b']}")
+
+def stage_classify(data, cfg):
+    import master
+    import ta_sched
+    from schedule_io import flatten_clinics, flatten_lectures
+
+    data.assigned_schedule, data.other_schedule = master.classify(data.df)
+    data.clinics = ta_sched.extract_clinics(data.records)
+    # The lectures JSON the standalone tools (renderers, occupancy, room_index ...) read;
+    # the clinics JSON is written by the assign stage, once the sessions carry Workers
+    save_json(data.other_schedule, out_path(cfg, cfg["lectures_json"]))
+    clinics = sum(len(v) for v in data.assigned_schedule.values())
+    lectures = sum(len(v) for v in data.other_schedule.values())
+    print(f"✅ Classified {clinics} clinics and {lectures} lectures")
+    record_history(cfg, "sessions", flatten_clinics(data.assigned_schedule) + flatten_lectures(data.other_schedule))
+
+def stage_assign(data, cfg):
+    import ta_sched
+    from coverage import REPORT_NAME, build_coverage, save_report
+
+    data.ta_assigned, data.workers = ta_sched.assign_workers(data.clinics, cfg["workers"])
+    # day -> location -> sessions with Workers, the shape sched.py / per-instructor.py expect
+    save_json(data.ta_assigned, out_path(cfg, cfg["clinics_json"]))
+    cov = build_coverage(data.ta_assigned, ta_sched.required_workers_for)
+    save_report(cov, out_path(cfg, REPORT_NAME))
+    print(f"✅ Assigned {cfg['workers']} workers, {len(cov.unstaffed())} sessions short of workers")
+    record_history(cfg, "assignment", data.ta_assigned)
+
+def stage_export(data, cfg):
+    from export_cache import BackgroundWriter, load_manifest, save_manifest
+
+    out_dir = cfg["out_dir"]
+    manifest = load_manifest(out_dir)
+    # Finished workbooks are written in the background while the next export is laid out;
+    # leaving the block waits for all of them and raises if any failed. The manifest is
+    # saved either way and only records the files that were written.
+    try:
+        with BackgroundWriter() as writer:
+            if "master" in cfg["exports"]:
+                import master
+
+                issues = master.instructor_issues(data.assigned_schedule, data.other_schedule, cfg["travel_minutes"])
+                workbooks = master.layout(data.assigned_schedule, data.other_schedule, manifest, out_dir, issues)
+                master.save(workbooks, manifest, out_dir, writer)
+            if "ta" in cfg["exports"]:
+                import ta_sched
+
+                if data.ta_assigned is None:
+                    stage_assign(data, cfg)
+                output_file = out_path(cfg, cfg["ta_file"])
+                wb, sheet_hashes, _ = ta_sched.layout(data.ta_assigned, data.workers, output_file, manifest, out_dir)
+                ta_sched.save(wb, output_file, sheet_hashes, manifest, out_dir, writer)
+            if "site" in cfg["exports"]:
+                from renderers import render_all
+
+                site_dir = out_path(cfg, cfg["site_dir"])
+                written, reused = render_all(data.sessions(), site_dir, cfg["term_start"], cfg["weeks"])
+                print(f"✅ Site written to {site_dir} ({len(written)} files written, {len(reused)} unchanged)")
+            if "occupancy" in cfg["exports"]:
+                from occupancy import write_occupancy_workbook
+
+                write_occupancy_workbook(data.sessions(), out_path(cfg, cfg["occupancy_file"]), writer)
+    finally:
+        save_manifest(manifest, out_dir)
+
+def stage_conflicts(data, cfg):
+    from conflict_engine import find_conflicts, write_conflict_report
+
+    path = out_path(cfg, cfg["conflicts_file"])
+    groups, pairs = find_conflicts(data.sessions(), capacities=cfg["location_capacity"])
+    write_conflict_report(groups, pairs, path)
+    print(f"✅ {len(groups)} conflict groups ({len(pairs)} overlapping pairs) saved to {path}")
+
+STAGE_FUNCS = {
+    "fetch": stage_fetch,
+    "classify": stage_classify,
+    "assign": stage_assign,
+    "export": stage_export,
+    "conflicts": stage_conflicts,
+}
+
+def run(stages, cfg, data=None):
+    """Run the stages in pipeline order, adding any stage they depend on."""
+    from profiling import Profiler
+
+    data = data or Dataset()
+    profiler = Profiler(enabled=bool(cfg["profile"]))
+    wanted = set()
+    pending = list(stages)
+    while pending:
+        stage = pending.pop()
+        if stage not in wanted:
+            wanted.add(stage)
+            pending += DEPENDS[stage]
+    os.makedirs(cfg["out_dir"], exist_ok=True)
+    for stage in STAGES:
+        if stage in wanted and stage not in data.done:
+            t0 = time.perf_counter()
+            with profiler.stage(stage):
+                STAGE_FUNCS[stage](data, cfg)
+            data.timings[stage] = round(time.perf_counter() - t0, 4)
+            data.done.append(stage)
+    profiler.save(cfg["profile"])
+    return data
+
+# -------------------------------
+# Batch: many faculties in parallel processes
+# -------------------------------
+# Each faculty gets a one-process pool of its own, at most `jobs` at a time.
+# A shared pool would not do: when one worker process dies, the executor is
+# broken and every pending or running faculty fails with BrokenProcessPool.
+BATCH_SUMMARY = "batch_summary.json"
+
+def run_faculty(b, cfg):
+    """Pool worker: the whole pipeline for one faculty, in <out_dir>/<b>/ with its output in run.log."""
+    cfg = dict(cfg, b=b, out_dir=os.path.join(cfg["out_dir"], str(b)))
+    if cfg["profile"]:  # one profile per faculty, next to its run.log
+        cfg["profile"] = os.path.join(cfg["out_dir"], os.path.basename(cfg["profile"]))
+    os.makedirs(cfg["out_dir"], exist_ok=True)
+    result = {"b": b, "out_dir": cfg["out_dir"], "ok": False, "error": None, "timings": {}}
+    t0 = time.perf_counter()
+    data = Dataset()
+    try:
+        with open(os.path.join(cfg["out_dir"], "run.log"), "w", encoding="utf-8") as log, \
+                contextlib.redirect_stdout(log):
+            run(cfg["stages"], cfg, data)
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["timings"] = data.timings
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    return result
+
+def run_batch(faculties, cfg, jobs=None):
+    """Run every faculty in its own process; a failing, dying or slow one never stops the rest."""
+    os.makedirs(cfg["out_dir"], exist_ok=True)
+    t0 = time.perf_counter()
+    results = []
+    pending, running = list(faculties), {}  # future -> (b, its pool, start time)
+    while pending or running:
+        while pending and len(running) < (jobs or os.cpu_count()):
+            b = pending.pop(0)
+            pool = ProcessPoolExecutor(max_workers=1)
+            running[pool.submit(run_faculty, b, cfg)] = (b, pool, time.perf_counter())
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            b, pool, started = running.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:  # the worker process itself died; same keys as run_faculty
+                result = {"b": b, "out_dir": os.path.join(cfg["out_dir"], str(b)), "ok": False,
+                          "error": f"{type(e).__name__}: {e}", "timings": {},
+                          "seconds": round(time.perf_counter() - started, 3)}
+            pool.shutdown()
+            results.append(result)
+            if result["ok"]:
+                print(f"✅ b={result['b']} done in {result['seconds']:.1f}s -> {result['out_dir']}")
+            else:
+                print(f"⚠️ b={result['b']} failed: {result['error']}")
+
+    results.sort(key=lambda r: faculties.index(r["b"]))
+    summary = {
+        "stages": cfg["stages"],
+        "jobs": jobs or os.cpu_count(),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "succeeded": [r["b"] for r in results if r["ok"]],
+        "failed": [r["b"] for r in results if not r["ok"]],
+        "faculties": results,
+    }
+    path = os.path.join(cfg["out_dir"], BATCH_SUMMARY)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"✅ {len(summary['succeeded'])} of {len(faculties)} faculties done in {summary['seconds']:.1f}s, "
+          f"summary saved to {path}")
+    return summary
+
+# -------------------------------
+# Config and command line
+# -------------------------------
+def term_start_date(value):
+    """YYYY-MM-DD -> date, for --term-start and the config's "term_start"."""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"term start must be YYYY-MM-DD, got {value!r}")
+
+def load_config(path):
+    cfg = dict(DEFAULTS)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg.update(json.load(f))
+        if isinstance(cfg["term_start"], str):
+            try:
+                cfg["term_start"] = term_start_date(cfg["term_start"])
+            except argparse.ArgumentTypeError as e:
+                raise SystemExit(f"{path}: {e}")
+    return cfg
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", help="JSON file with any of: " + ", ".join(DEFAULTS))
+    common.add_argument("--b", type=int, help="registrar materials page parameter")
+    common.add_argument("--workers", type=int, help="total number of workers to assign")
+    common.add_argument("--out-dir", dest="out_dir")
+    common.add_argument("--raw", help="also save the fetched registrar table as CSV")
+    common.add_argument("--exports", nargs="+", choices=EXPORTS)
+    common.add_argument("--ta-file", dest="ta_file")
+    common.add_argument("--conflicts-file", dest="conflicts_file")
+    common.add_argument("--travel-minutes", dest="travel_minutes", type=int)
+    common.add_argument("--profile", metavar="PREFIX",
+                        help="record per-stage timings to PREFIX.json and PREFIX.trace.json")
+    common.add_argument("--term", help="term label stored in the history database")
+    common.add_argument("--history-db", dest="history_db")
+    common.add_argument("--term-start", dest="term_start", type=term_start_date,
+                        help="first teaching day (YYYY-MM-DD) for ICS feeds")
+
+    parser = argparse.ArgumentParser(prog="schedualer", description="Clinic and lecture scheduling pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for stage in STAGES:
+        sub.add_parser(stage, parents=[common], help=f"run {stage} (and the stages it needs)")
+    pipeline = sub.add_parser("pipeline", parents=[common], help="run several stages in one process")
+    pipeline.add_argument("--stages", nargs="+", choices=STAGES)
+    batch = sub.add_parser("batch", parents=[common], help="run the pipeline for several faculties in parallel")
+    batch.add_argument("--faculties", type=int, nargs="+", help="b values, one output directory each")
+    batch.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    batch.add_argument("--stages", nargs="+", choices=STAGES)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    cfg = load_config(args.config)
+    cfg.update({k: v for k, v in vars(args).items() if k in DEFAULTS and v is not None})
+    if args.command == "batch":
+        if not cfg["faculties"]:
+            raise SystemExit("batch needs --faculties or \"faculties\" in the config")
+        run_batch(cfg["faculties"], cfg, cfg["jobs"])
+        return
+    stages = cfg["stages"] if args.command == "pipeline" else [args.command]
+    run(stages, cfg)
+
+if __name__ == "__main__":
+    main()
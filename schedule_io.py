@@ -0,0 +1,116 @@
+import json
+from functools import lru_cache
+
+from names import name_key
+
+# -------------------------------
+# Shared helpers for the saved schedule JSON files
+# -------------------------------
+# Clinics come either grouped by day only (master.py / schedule.json) or by
+# day and location (ta_sched.py / assigned_schedule_updated.json); lectures
+# are grouped by day (other_schedule.json). Everything downstream works on
+# one flat list of session dicts with "Day" and "Type" added.
+
+DAY_ORDER = ["سبت", "احد", "اثنين", "ثلاث", "اربعاء", "خميس", "جمعة"]
+
+# The registrar names campuses in Arabic, ta_sched.py in English
+CAMPUS_ALIASES = {"الجديد": "New Campus", "القديم": "Old Campus"}
+# Room codes the registrar uses for "no room yet" (509999 holds most clinics)
+PLACEHOLDER_ROOMS = {"509999", "0", "-", "nan", "None"}
+
+def time_to_minutes(t):
+    h, m = map(int, t.strip().split(":"))
+    return h*60 + m
+
+def minutes_to_time(m):
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+def day_sort_key(day):
+    return DAY_ORDER.index(day) if day in DAY_ORDER else len(DAY_ORDER)
+
+# -------------------------------
+# Weekday masks
+# -------------------------------
+# A registrar day field can name several weekdays ("احد ثلاث", "الأحد/الثلاثاء").
+# day_mask() parses it once per distinct string into a 7-bit mask (bit i =
+# DAY_ORDER[i]); overlap tests AND the masks before looking at times, and
+# expand_days() hands out one session per weekday only where it is needed.
+# A field naming no weekday ("غير محدد") has mask 0 and stays its own day.
+DAY_BITS = {day: 1 << i for i, day in enumerate(DAY_ORDER)}
+DAY_KEYS = [(name_key(day), bit) for day, bit in DAY_BITS.items()]
+MASK_DAYS = [tuple(day for day, bit in DAY_BITS.items() if mask & bit) for mask in range(1 << len(DAY_ORDER))]
+
+@lru_cache(maxsize=None)
+def day_mask(day):
+    key = name_key(day)
+    mask = 0
+    for day_key, bit in DAY_KEYS:
+        if day_key in key:
+            mask |= bit
+    return mask
+
+def days_of(day):
+    """Weekday names a day field stands for, in DAY_ORDER; unparsed fields map to themselves."""
+    return MASK_DAYS[day_mask(day)] or (day,)
+
+def expand_days(sessions):
+    """Yield sessions one weekday at a time; single-day sessions pass through uncopied."""
+    for s in sessions:
+        days = days_of(s["Day"])
+        if days == (s["Day"],):
+            yield s
+        else:
+            for day in days:
+                yield dict(s, Day=day)
+
+def canonical_location(loc):
+    loc = str(loc or "").strip()
+    return CAMPUS_ALIASES.get(loc, loc)
+
+def real_room(room):
+    """Room code, or "" for an empty or placeholder room."""
+    room = str(room or "").strip()
+    return "" if room in PLACEHOLDER_ROOMS else room
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def flatten_clinics(schedule):
+    sessions = []
+    for day, value in schedule.items():
+        if isinstance(value, dict):
+            groups = value.items()
+        else:
+            groups = [(None, value)]
+        for loc, entries in groups:
+            for e in entries:
+                s = dict(e)
+                s["Course"] = s.get("Course", s.get("Clinic", ""))
+                if loc is not None:
+                    s["Location"] = loc
+                s["Day"] = day
+                s["Type"] = "clinic"
+                sessions.append(s)
+    return sessions
+
+def flatten_lectures(schedule):
+    sessions = []
+    for day, entries in schedule.items():
+        for e in entries:
+            s = dict(e)
+            s["Day"] = day
+            s["Type"] = "lecture"
+            sessions.append(s)
+    return sessions
+
+def load_sessions(clinics_path="assigned_schedule_updated.json", lectures_path="other_schedule.json"):
+    sessions = []
+    if clinics_path:
+        sessions += flatten_clinics(load_json(clinics_path))
+    if lectures_path:
+        sessions += flatten_lectures(load_json(lectures_path))
+    return sessions
+
+def has_time(s):
+    return bool(str(s.get("From", "")).strip() and str(s.get("To", "")).strip())
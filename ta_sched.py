@@ -1,75 +1,18 @@
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-import re
-import json
-from datetime import datetime, timedelta
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Alignment
+import argparse
 import hashlib
 
-# -------------------------------
-# 1️⃣ User inputs
-# -------------------------------
-b_value = 10761
-total_workers = int(input("Enter total number of workers: "))
-output_file = "Scheduale.xlsx"
+from export_cache import BackgroundWriter, content_hash, load_manifest, open_workbook, finish_workbook, save_manifest
+from names import group_by_name, name_key
+from profiling import Profiler, workbook_counts
+from registrar import fetch_html, is_missing, normalize_time, parse_rows, rows_to_records
+from schedule_io import day_sort_key, days_of
+from time_grid import build_time_grid, grid_labels, slot_span
 
-# -------------------------------
-# 2️⃣ Fetch schedule from website
-# -------------------------------
-url = "https://zajelbs.najah.edu/servlet/materials"
-payload = {"b": b_value}
-response = requests.post(url, data=payload)
-if response.status_code != 200:
-    raise Exception(f"POST request failed with status code {response.status_code}")
-
-response.encoding = "windows-1256"
-html_content = response.text
-soup = BeautifulSoup(html_content, "html.parser")
-tables = soup.find_all("table")
-
-def normalize_text(s):
-    if not s:
-        return ""
-    s = str(s).replace("\xa0", " ").replace("&nbsp;", " ")
-    s = re.sub(r"\s+", " ", s)
-    return s.strip()
-
-# Identify table by headers
-key_headers = ["المساق/ش", "اسم المساق", "س.م", "الأيام", "الساعة",
-               "القاعة", "الحرم", "المتطلبات السابقة", "المدرس", "أرقام مساقات مكافئة"]
-target_table = None
-for table in tables:
-    first_row = table.find("tr")
-    if not first_row:
-        continue
-    cols = [normalize_text(td.get_text()) for td in first_row.find_all("td")]
-    if all(any(kh in c for c in cols) for kh in key_headers):
-        target_table = table
-        break
-if target_table is None:
-    raise Exception("Could not find the table with the expected headers")
-
-# Extract rows
-rows = []
-for tr in target_table.find_all("tr")[1:]:
-    cols = tr.find_all("td")
-    if len(cols) == 0:
-        continue
-    row = [normalize_text(td.get_text(separator=" ", strip=True)) for td in cols]
-    rows.append(row)
-
-# Create DataFrame
-df = pd.DataFrame(rows)
-if df.shape[1] >= 12:
-    df.columns = ["Image", "Empty1", "المساق/ش", "اسم المساق", "س.م",
-                  "الأيام", "الساعة", "القاعة", "الحرم",
-                  "المتطلبات السابقة", "المدرس", "أرقام مساقات مكافئة"]
-    df = df.drop(columns=["Image", "Empty1"])
+# Bump when the sheet layout below changes so cached sheets are rebuilt
+STYLE_VERSION = 4
 
 # -------------------------------
-# 3️⃣ Filter clinics and assign location
+# 1️⃣ Filter clinics and assign location
 # -------------------------------
 clinic_keywords = ["عيادة", "عملي", "مختبر"]
 old_campus_clinics = [
@@ -80,107 +23,152 @@ old_campus_clinics = [
     "عيادة مداواة الأسنان اللبية 4",
     "عيادة علم أمراض اللثة 3"
 ]
-
-def normalize_time(time_str):
-    if pd.isna(time_str) or str(time_str).strip() == "":
-        return "", ""
-    try:
-        start, end = time_str.split("-")
-        return start.strip(), end.strip()
-    except:
-        return "", ""
+old_campus_keys = {name_key(c) for c in old_campus_clinics}
 
 def determine_location(clinic_name):
     if "عملي" in clinic_name or "مختبر" in clinic_name:
         return "New Campus"
-    elif clinic_name in old_campus_clinics:
+    elif name_key(clinic_name) in old_campus_keys:
         return "Old Campus"
     else:
         return "CELT"
 
-clinics_schedule = {}
-for _, row in df.iterrows():
-    row_text = " ".join([str(cell) for cell in row if pd.notna(cell)])
-    if not any(k in row_text for k in clinic_keywords):
-        continue
+def cell(row, key, default=""):
+    value = row.get(key)
+    return default if is_missing(value) else value
+
+def extract_clinics(records):
+    """records: registrar rows as dicts (registrar.rows_to_records or DataFrame.to_dict("records"))."""
+    clinics_schedule = {}
+    for row in records:
+        row_text = " ".join([str(v) for v in row.values() if not is_missing(v)])
+        if not any(k in row_text for k in clinic_keywords):
+            continue
 
-    day = row["الأيام"] if pd.notna(row["الأيام"]) else "غير محدد"
-    time_str = row["الساعة"] if pd.notna(row["الساعة"]) else ""
-    start_time, end_time = normalize_time(time_str)
-    room = str(row["القاعة"]).strip() if pd.notna(row["القاعة"]) else ""
-    course_name = str(row["اسم المساق"]).strip() if pd.notna(row["اسم المساق"]) else ""
-    instructor = str(row["المدرس"]).strip() if pd.notna(row["المدرس"]) else ""
+        day = cell(row, "الأيام", "غير محدد")
+        time_str = cell(row, "الساعة")
+        start_time, end_time = normalize_time(time_str)
+        room = str(cell(row, "القاعة")).strip()
+        course_name = str(cell(row, "اسم المساق")).strip()
+        instructor = str(cell(row, "المدرس")).strip()
 
-    if not any([course_name, start_time, end_time, room, instructor]):
-        continue
+        if not any([course_name, start_time, end_time, room, instructor]):
+            continue
 
-    location = determine_location(course_name)
-    entry = {"Course": course_name, "From": start_time, "To": end_time,
-             "Room": room, "Location": location, "Instructor": instructor}
+        location = determine_location(course_name)
+        entry = {"Course": course_name, "From": start_time, "To": end_time,
+                 "Room": room, "Location": location, "Instructor": instructor}
 
-    if day not in clinics_schedule:
-        clinics_schedule[day] = {"New Campus": [], "Old Campus": [], "CELT": []}
-    clinics_schedule[day][location].append(entry)
+        if day not in clinics_schedule:
+            clinics_schedule[day] = {"New Campus": [], "Old Campus": [], "CELT": []}
+        clinics_schedule[day][location].append(entry)
+    return clinics_schedule
 
 # -------------------------------
-# 4️⃣ Worker assignment
+# 2️⃣ Worker assignment
 # -------------------------------
-workers = list(range(1, total_workers+1))
-worker_assignments = {w: [] for w in workers}
-worker_day_location = {w: {} for w in workers}
-
 def time_to_minutes(t):
     h, m = map(int, t.split(":"))
     return h*60 + m
 
-def is_overlap(start1, end1, start2, end2):
-    return not (end1 <= start2 or end2 <= start1)
-
-assigned_schedule = {}
-for day, locations in clinics_schedule.items():
-    assigned_schedule[day] = {}
-    for location, sessions in locations.items():
-        sessions_sorted = sorted(sessions, key=lambda s: time_to_minutes(s["From"]))
-        assigned_schedule[day][location] = []
-
-        for session in sessions_sorted:
-            if location == "New Campus":
-                if course_name.strip() == "طب الأسنان التحفظي 1/ عملي":
-                    required_workers = 2
-                else:
-                    required_workers = 1
-            else:
+def minute_mask(start, end):
+    """Bitset of the minutes [start, end) of a day."""
+    return ((1 << (end - start)) - 1) << start if end > start else 0
+
+class WorkerIndex:
+    """The assigner's occupancy index: per worker, a minute bitset per weekday and the sessions behind it.
+
+    A session bucket naming several weekdays sets bits on each of them; an
+    unparsed day string is its own key, as before.
+    """
+    def __init__(self, workers=()):
+        self.reset(workers)
+
+    def reset(self, workers):
+        self.workers = list(workers)
+        self.busy = {w: {} for w in self.workers}         # worker -> day -> minute bitset
+        self.placed = {w: [] for w in self.workers}       # worker -> [(days, mask, day, location, session)]
+
+    def is_free(self, w, days, mask):
+        busy = self.busy[w]
+        return not any(busy.get(d, 0) & mask for d in days)
+
+    def add(self, w, days, mask, day, location, session):
+        busy = self.busy[w]
+        for d in days:
+            busy[d] = busy.get(d, 0) | mask
+        self.placed[w].append((days, mask, day, location, session))
+
+    def load(self, w):
+        return len(self.placed[w])
+
+    def blockers(self, w, days, mask):
+        """Placements of worker w that overlap the given days and minutes."""
+        return [p for p in self.placed[w] if p[1] & mask and set(p[0]) & set(days)]
+
+DOUBLE_STAFFED_LAB = name_key("طب الأسنان التحفظي 1/ عملي")
+
+def required_workers_for(session, location):
+    if location == "New Campus":
+        if name_key(session["Course"]) == DOUBLE_STAFFED_LAB:
+            return 2
+        return 1
     # Old Campus and CELT
-                required_workers = 2
-            assigned_workers = []
-
-            candidates = [w for w in workers if day in worker_day_location[w] and worker_day_location[w][day] == location]
-            candidates += sorted([w for w in workers if w not in candidates], key=lambda w: len(worker_assignments[w]))
-
-            session_start = time_to_minutes(session["From"])
-            session_end = time_to_minutes(session["To"])
-
-            for w in candidates:
-                if len(assigned_workers) >= required_workers:
-                    break
-                conflict = any(s_day == day and is_overlap(session_start, session_end, s_start, s_end)
-                               for s_day, s_start, s_end in worker_assignments[w])
-                if conflict:
-                    continue
-                worker_assignments[w].append((day, session_start, session_end))
-                worker_day_location[w][day] = location
-                assigned_workers.append(w)
-
-            while len(assigned_workers) < required_workers:
-                assigned_workers.append(None)
-                print(f"⚠️ Warning: Not enough workers for {session['Course']} on {day} at {location}")
-
-            session_copy = session.copy()
-            session_copy["Workers"] = assigned_workers
-            assigned_schedule[day][location].append(session_copy)
+    return 2
+
+def assign_slots(clinics_schedule, total_workers, warn=True, absent=(), index=None):
+    """Yield (day, location, session, workers) in assignment order; sessions are not copied.
+
+    Workers in `absent` are left out of the roster (used by the absence
+    simulation). Pass a WorkerIndex to keep the occupancy index afterwards.
+    """
+    workers = [w for w in range(1, total_workers+1) if w not in absent]
+    index = index if index is not None else WorkerIndex()
+    index.reset(workers)
+    worker_day_location = {w: {} for w in workers}
+
+    for day, locations in clinics_schedule.items():
+        days = days_of(day)  # weekdays this bucket meets on (or the unparsed day itself)
+        for location, sessions in locations.items():
+            sessions_sorted = sorted(sessions, key=lambda s: time_to_minutes(s["From"]))
+
+            for session in sessions_sorted:
+                required_workers = required_workers_for(session, location)
+                assigned_workers = []
+
+                candidates = [w for w in workers if day in worker_day_location[w] and worker_day_location[w][day] == location]
+                candidates += sorted([w for w in workers if w not in candidates], key=index.load)
+
+                mask = minute_mask(time_to_minutes(session["From"]), time_to_minutes(session["To"]))
+
+                for w in candidates:
+                    if len(assigned_workers) >= required_workers:
+                        break
+                    # Only the bitsets of the weekdays this session meets on are tested
+                    if not index.is_free(w, days, mask):
+                        continue
+                    index.add(w, days, mask, day, location, session)
+                    worker_day_location[w][day] = location
+                    assigned_workers.append(w)
+
+                while len(assigned_workers) < required_workers:
+                    assigned_workers.append(None)
+                    if warn:
+                        print(f"⚠️ Warning: Not enough workers for {session['Course']} on {day} at {location}")
+                yield day, location, session, assigned_workers
+
+def assign_workers(clinics_schedule, total_workers):
+    workers = list(range(1, total_workers+1))
+    assigned_schedule = {day: {location: [] for location in locations}
+                         for day, locations in clinics_schedule.items()}
+    for day, location, session, assigned_workers in assign_slots(clinics_schedule, total_workers):
+        session_copy = session.copy()
+        session_copy["Workers"] = assigned_workers
+        assigned_schedule[day][location].append(session_copy)
+    return assigned_schedule, workers
 
 # -------------------------------
-# 5️⃣ Excel export
+# 3️⃣ Excel export
 # -------------------------------
 def unique_color(name):
     h = hashlib.md5(name.encode("utf-8")).hexdigest()
@@ -190,105 +178,213 @@ def unique_color(name):
     return f"{r:02X}{g:02X}{b:02X}"
 
 clinic_colors = {}
-time_grid = [(datetime.strptime("08:00","%H:%M")+timedelta(minutes=30*i)).strftime("%H:%M") for i in range(20)]
-time_to_col = {t: idx+2 for idx,t in enumerate(time_grid)}
-
-wb = Workbook()
-ws = wb.active
-ws.title = "Clinics Schedule"
-ws.column_dimensions["A"].width = 20
-for i in range(len(time_grid)):
-    ws.column_dimensions[chr(66+i)].width = 15
-
-row_idx = 1
-for t,col in time_to_col.items():
-    ws.cell(row=row_idx, column=col, value=t)
-row_idx +=1
-
-for day, locations in assigned_schedule.items():
-    ws.cell(row=row_idx, column=1, value=day)
-    ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=len(time_grid)+1)
-    ws.cell(row=row_idx, column=1).alignment = Alignment(horizontal="center", vertical="center")
-    row_idx +=1
 
-    for loc in ["New Campus","Old Campus","CELT"]:
-        sessions_in_loc = locations.get(loc,[])
-        if not sessions_in_loc:
-            continue
+def build_schedule_sheet(ws, assigned_schedule, grid):
+    from openpyxl.styles import Alignment, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    time_grid = grid_labels(grid)
+    ws.column_dimensions["A"].width = 20
+    for i in range(len(time_grid)):
+        ws.column_dimensions[get_column_letter(i+2)].width = 15
+
+    row_idx = 1
+    for idx,t in enumerate(time_grid):
+        ws.cell(row=row_idx, column=idx+2, value=t)
+    row_idx +=1
 
-        ws.cell(row=row_idx, column=1, value=loc)
+    for day, locations in assigned_schedule.items():
+        ws.cell(row=row_idx, column=1, value=day)
+        ws.merge_cells(start_row=row_idx, start_column=1, end_row=row_idx, end_column=len(time_grid)+1)
         ws.cell(row=row_idx, column=1).alignment = Alignment(horizontal="center", vertical="center")
         row_idx +=1
 
-        courses = {}
-        for s in sessions_in_loc:
-            course_name = s["Course"]
-            courses.setdefault(course_name,[]).append(s)
-
-        for course_name,sessions in courses.items():
-            this_row = row_idx
-            if course_name not in clinic_colors:
-                clinic_colors[course_name] = unique_color(course_name)
-
-            for s in sessions:
-                start_col = min([col for t,col in time_to_col.items() if t>=s["From"]], default=2)
-                end_col = max([col for t,col in time_to_col.items() if t<s["To"]], default=start_col)
-                ws.merge_cells(start_row=this_row, start_column=start_col, end_row=this_row, end_column=end_col)
-                clinic_text = f"{course_name}\n{' / '.join([str(w) for w in s['Workers'] if w])}\n{s['Instructor']}\n{s['From']}-{s['To']}"
-                ws.cell(row=this_row, column=start_col, value=clinic_text)
-                ws.cell(row=this_row, column=start_col).alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                ws.row_dimensions[this_row].height = max(ws.row_dimensions[this_row].height or 15, clinic_text.count("\n")*15)
-                for c in range(start_col,end_col+1):
-                    ws.cell(row=this_row, column=c).fill = PatternFill(
-                    start_color=clinic_colors[course_name],
-                    end_color=clinic_colors[course_name],  # ✅ use course_name
-                    fill_type="solid"
-)
+        for loc in ["New Campus","Old Campus","CELT"]:
+            sessions_in_loc = locations.get(loc,[])
+            if not sessions_in_loc:
+                continue
+
+            ws.cell(row=row_idx, column=1, value=loc)
+            ws.cell(row=row_idx, column=1).alignment = Alignment(horizontal="center", vertical="center")
             row_idx +=1
-    row_idx +=1
 
+            courses = group_by_name(sessions_in_loc, lambda s: s["Course"])
+
+            for course_name,sessions in courses.items():
+                this_row = row_idx
+                color_key = name_key(course_name)
+                if color_key not in clinic_colors:
+                    clinic_colors[color_key] = unique_color(color_key)
+
+                for s in sessions:
+                    span = slot_span(grid, s["From"], s["To"])
+                    if span is None:
+                        continue
+                    start_col, end_col = span[0]+2, span[1]+2
+                    ws.merge_cells(start_row=this_row, start_column=start_col, end_row=this_row, end_column=end_col)
+                    clinic_text = f"{course_name}\n{' / '.join([str(w) for w in s['Workers'] if w])}\n{s['Instructor']}\n{s['From']}-{s['To']}"
+                    ws.cell(row=this_row, column=start_col, value=clinic_text)
+                    ws.cell(row=this_row, column=start_col).alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+                    ws.row_dimensions[this_row].height = max(ws.row_dimensions[this_row].height or 15, clinic_text.count("\n")*15)
+                    for c in range(start_col,end_col+1):
+                        ws.cell(row=this_row, column=c).fill = PatternFill(
+                        start_color=clinic_colors[color_key],
+                        end_color=clinic_colors[color_key],  # ✅ one colour per course
+                        fill_type="solid"
+    )
+                row_idx +=1
+        row_idx +=1
+
+
+# -------------------------------
+# 4️⃣ Add summary sheet
+# -------------------------------
+def minutes_column(times):
+    hm = times.str.split(":", n=1, expand=True).reindex(columns=[0, 1])
+    return hm[0].astype(float) * 60 + hm[1].astype(float)
+
+def assignment_table(assigned_schedule):
+    """Flat (worker, session) table: one row per worker slot filled in a session, per weekday it meets."""
+    import pandas as pd
+
+    rows = []
+    for bucket, locs in assigned_schedule.items():
+        for day in days_of(bucket):
+            for loc, sessions in locs.items():
+                for s in sessions:
+                    is_lab = "مختبر" in s["Course"] or "عملي" in s["Course"]
+                    for w in s["Workers"]:
+                        if w is not None:
+                            rows.append((w, day, loc, s["From"], s["To"], is_lab))
+    table = pd.DataFrame(rows, columns=["Worker", "Day", "Location", "From", "To", "Lab"])
+    table["Start"] = minutes_column(table["From"])
+    table["End"] = minutes_column(table["To"])
+    table["Minutes"] = table["End"] - table["Start"]
+    return table
+
+def worker_summary(assigned_schedule, workers):
+    """Per-worker totals, per-day hours, campuses and idle gaps via group-bys on the flat table."""
+    import pandas as pd
+
+    table = assignment_table(assigned_schedule)
+    by_worker = table.groupby("Worker")
+    summary = pd.DataFrame(index=pd.Index(workers, name="Worker"))
+    summary["Total Hours"] = by_worker["Minutes"].sum() / 60
+    summary["Total Clinics"] = (~table["Lab"]).groupby(table["Worker"]).sum()
+    summary["Total Labs/Practicals"] = by_worker["Lab"].sum()
+    campuses = table[["Worker", "Location"]].drop_duplicates().sort_values("Location")
+    summary["Campuses"] = campuses.groupby("Worker")["Location"].agg(", ".join)
+
+    # Idle time: gap between a session and the latest end before it on the same day
+    table = table.sort_values(["Worker", "Day", "Start"])
+    latest_end = table.groupby(["Worker", "Day"])["End"].cummax()
+    latest_end = latest_end.groupby([table["Worker"], table["Day"]]).shift()
+    table["Idle"] = (table["Start"] - latest_end).clip(lower=0).fillna(0)
+    summary["Idle Hours"] = table.groupby("Worker")["Idle"].sum() / 60
+
+    per_day = table.pivot_table(index="Worker", columns="Day", values="Minutes", aggfunc="sum") / 60
+    for day in sorted(per_day.columns, key=day_sort_key):
+        summary[f"{day} Hours"] = per_day[day]
+
+    summary = summary.fillna({"Campuses": ""}).fillna(0)
+    count_cols = ["Total Clinics", "Total Labs/Practicals"]
+    summary[count_cols] = summary[count_cols].astype(int)
+    return summary.round(2)
+
+def build_summary_sheet(summary_ws, assigned_schedule, workers):
+    from openpyxl.utils import get_column_letter
+
+    summary = worker_summary(assigned_schedule, workers)
+
+    # Headers
+    summary_ws.append(["Worker"] + list(summary.columns))
+    for w, row in zip(summary.index, summary.itertuples(index=False)):
+        summary_ws.append([w] + list(row))
+
+    # Optional: adjust column widths
+    for idx in range(1, summary.shape[1] + 2):
+        summary_ws.column_dimensions[get_column_letter(idx)].width = 20
 
 # -------------------------------
-# 7️⃣ Add summary sheet
+# 5️⃣ Layout and save
 # -------------------------------
-summary_ws = wb.create_sheet(title="Summary")
-
-# Headers
-summary_ws.cell(row=1, column=1, value="Worker")
-summary_ws.cell(row=1, column=2, value="Total Hours")
-summary_ws.cell(row=1, column=3, value="Total Clinics")
-summary_ws.cell(row=1, column=4, value="Total Labs/Practicals")
-
-# Calculate totals for each worker
-for idx, w in enumerate(workers, start=2):
-    total_minutes = 0
-    total_clinics = 0
-    total_labs = 0
-
-    for day, locs in assigned_schedule.items():
-        for loc, sessions in locs.items():
-            for s in sessions:
-                if w in s["Workers"]:
-                    # Add hours
-                    start = datetime.strptime(s["From"], "%H:%M")
-                    end = datetime.strptime(s["To"], "%H:%M")
-                    delta = end - start
-                    total_minutes += delta.total_seconds() / 60
-
-                    # Count clinic/lab
-                    if "مختبر" in s["Course"] or "عملي" in s["Course"]:
-                        total_labs += 1
-                    else:
-                        total_clinics += 1
-
-    summary_ws.cell(row=idx, column=1, value=w)
-    summary_ws.cell(row=idx, column=2, value=round(total_minutes / 60, 2))
-    summary_ws.cell(row=idx, column=3, value=total_clinics)
-    summary_ws.cell(row=idx, column=4, value=total_labs)
-
-# Optional: adjust column widths
-for col in ["A", "B", "C", "D"]:
-    summary_ws.column_dimensions[col].width = 20
-
-wb.save(output_file)
-print(f"✅ Combined schedule exported to {output_file}")
\ No newline at end of file
+def layout(assigned_schedule, workers, output_file, manifest, out_dir="."):
+    """Build the sheets whose hash changed; returns (workbook, sheet hashes, rebuilt titles)."""
+    # Columns follow the sessions: GCD step, spanning only the scheduled hours
+    time_grid = build_time_grid([s for locs in assigned_schedule.values() for lst in locs.values() for s in lst])
+
+    # Only rebuild sheets whose inputs changed since the last export
+    sheet_hashes = {
+        "Clinics Schedule": content_hash(STYLE_VERSION, time_grid, assigned_schedule),
+        "Summary": content_hash(STYLE_VERSION, workers, assigned_schedule),
+        "Shortfall": content_hash(STYLE_VERSION, time_grid, assigned_schedule),
+    }
+    wb, stale = open_workbook(output_file, sheet_hashes, manifest, out_dir)
+    if "Clinics Schedule" in stale:
+        build_schedule_sheet(wb.create_sheet("Clinics Schedule"), assigned_schedule, time_grid)
+    if "Summary" in stale:
+        build_summary_sheet(wb.create_sheet(title="Summary"), assigned_schedule, workers)
+    if "Shortfall" in stale:
+        from coverage import build_coverage, write_shortfall_sheet
+
+        write_shortfall_sheet(wb.create_sheet("Shortfall"),
+                              build_coverage(assigned_schedule, required_workers_for, time_grid))
+    return wb, sheet_hashes, stale
+
+def save(wb, output_file, sheet_hashes, manifest, out_dir=".", writer=None):
+    """With a caller's BackgroundWriter the save is only queued; the caller joins it and saves the manifest."""
+    if writer is None:
+        try:
+            with BackgroundWriter() as writer:
+                save(wb, output_file, sheet_hashes, manifest, out_dir, writer)
+        finally:
+            save_manifest(manifest, out_dir)  # holds only the files that were written
+        return
+    saved = lambda: print(f"✅ Combined schedule exported to {output_file}")
+    if not finish_workbook(wb, output_file, sheet_hashes, manifest, out_dir, writer, saved):
+        print(f"✅ {output_file} is up to date.")
+
+def main(b_value=10761, total_workers=None, output_file="Scheduale.xlsx", profile=None):
+    if total_workers is None:
+        total_workers = int(input("Enter total number of workers: "))
+
+    profiler = Profiler(enabled=bool(profile))
+    with profiler.stage("fetch") as st:
+        html = fetch_html(b_value)
+        st.count(bytes=len(html))
+    with profiler.stage("parse") as st:
+        records = rows_to_records(parse_rows(html))
+        st.count(rows=len(records))
+    with profiler.stage("classify") as st:
+        clinics_schedule = extract_clinics(records)
+        st.count(sessions=sum(len(l) for locs in clinics_schedule.values() for l in locs.values()))
+    with profiler.stage("assign") as st:
+        assigned_schedule, workers = assign_workers(clinics_schedule, total_workers)
+        st.count(workers=len(workers))
+
+    # The packaged app has no console, so staffing gaps also go to a report file
+    from coverage import REPORT_NAME, build_coverage, save_report
+
+    with profiler.stage("coverage") as st:
+        cov = build_coverage(assigned_schedule, required_workers_for)
+        save_report(cov, REPORT_NAME)
+        st.count(unstaffed=len(cov.unstaffed()))
+    if cov.unstaffed():
+        print(f"⚠️ {len(cov.unstaffed())} sessions are short of workers, see {REPORT_NAME}")
+
+    manifest = load_manifest()
+    with profiler.stage("layout") as st:
+        wb, sheet_hashes, stale = layout(assigned_schedule, workers, output_file, manifest)
+        if profiler.enabled:
+            st.count(sheets=len(stale), **workbook_counts(wb))
+    with profiler.stage("save"):
+        save(wb, output_file, sheet_hashes, manifest)
+    profiler.save(profile)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign workers to clinics and export Scheduale.xlsx")
+    parser.add_argument("--workers", type=int, help="total number of workers (asked for when omitted)")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="record per-stage timings to PREFIX.json and PREFIX.trace.json")
+    args = parser.parse_args()
+    main(total_workers=args.workers, profile=args.profile)
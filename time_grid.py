@@ -0,0 +1,52 @@
+from collections import namedtuple
+from functools import reduce
+from math import gcd
+
+from schedule_io import has_time, minutes_to_time, time_to_minutes
+
+# -------------------------------
+# Data-derived time grid
+# -------------------------------
+# The column step is the GCD of every session boundary (so each session
+# starts and ends exactly on a column edge) and the span of a grid covers
+# only the sessions shown on that sheet.
+
+TimeGrid = namedtuple("TimeGrid", ["start", "step", "size"])
+
+def session_minutes(sessions):
+    return [(time_to_minutes(s["From"]), time_to_minutes(s["To"])) for s in sessions if has_time(s)]
+
+def grid_step(sessions, default=30, min_step=5):
+    bounds = [m for pair in session_minutes(sessions) for m in pair]
+    if not bounds:
+        return default
+    step = reduce(gcd, bounds)
+    # 08:07-style typos would otherwise explode the grid into 1-minute columns
+    return max(step, min_step) if step else default
+
+def build_time_grid(sessions, step=None):
+    step = step or grid_step(sessions)
+    spans = session_minutes(sessions)
+    if not spans:
+        return TimeGrid(8*60, step, 0)
+    start = min(s for s, _ in spans) // step * step
+    end = max(e for _, e in spans)
+    size = -(-(end - start) // step)  # ceil
+    return TimeGrid(start, step, size)
+
+def grid_labels(grid):
+    return [minutes_to_time(grid.start + i*grid.step) for i in range(grid.size)]
+
+def grid_slots(grid):
+    return [(minutes_to_time(grid.start + i*grid.step), minutes_to_time(grid.start + (i+1)*grid.step))
+            for i in range(grid.size)]
+
+def slot_span(grid, start_time, end_time):
+    """First and last slot index (inclusive) covered by a session, or None if outside the grid."""
+    start = time_to_minutes(start_time) - grid.start
+    end = time_to_minutes(end_time) - grid.start
+    first = max(start // grid.step, 0)
+    last = min(-(-end // grid.step) - 1, grid.size - 1)
+    if last < first:
+        return None
+    return first, last
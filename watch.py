@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import schedualer
+from export_cache import content_hash
+from profiling import Profiler
+from registrar import URL, fetch_html_if_changed, parse_rows, rows_to_dataframe, rows_to_records
+from room_index import RoomIndex
+
+# -------------------------------
+# Watch daemon
+# -------------------------------
+# Polls the materials page and keeps the parsed schedule, the free-room index
+# and the worker assignment in memory between polls. A poll stops early when
+# the server answers 304, when the page bytes hash the same, or when only the
+# markup changed (same parsed rows). On a real change, assignment is re-run
+# only if the clinics changed, the room index is updated per key, conflicts
+# are re-checked only if the sessions changed, and the exports rebuild only
+# the sheets / pages whose content hash moved (export_cache manifest).
+#
+# GET /status      -> last poll / change times, counts and per-stage timings
+# GET /free-rooms  -> ?day=..&from=..&to=..[&location=..] from the live index
+
+def now():
+    return datetime.now().isoformat(timespec="seconds")
+
+class Watcher:
+    def __init__(self, cfg, url=URL):
+        self.cfg = cfg
+        self.url = url
+        self.data = schedualer.Dataset()
+        self.index = None
+        self.etag = self.last_modified = None
+        self.html_hash = self.rows_hash = self.clinics_hash = self.sessions_hash = None
+        self.lock = threading.Lock()
+        self.status = {"started": now(), "url": url, "b": cfg["b"], "polls": 0, "changes": 0,
+                       "last_poll": None, "last_result": None, "last_change": None, "last_error": None,
+                       "counts": {}, "timings": []}
+
+    def poll(self):
+        t0 = time.perf_counter()
+        try:
+            result = self._poll()
+            error = None
+        except Exception as e:  # keep watching; the status endpoint shows what went wrong
+            result, error = "error", f"{type(e).__name__}: {e}"
+        with self.lock:
+            self.status["polls"] += 1
+            self.status["last_poll"] = now()
+            self.status["last_result"] = result
+            self.status["poll_seconds"] = round(time.perf_counter() - t0, 4)
+            if error:
+                self.status["last_error"] = {"time": now(), "error": error}
+        return result
+
+    def _poll(self):
+        html, headers = fetch_html_if_changed(self.cfg["b"], self.url, self.etag, self.last_modified)
+        if html is None:
+            return "not modified"
+
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        if digest == self.html_hash:
+            return "unchanged"
+
+        rows = parse_rows(html)
+        rows_hash = content_hash(rows)
+        if rows_hash != self.rows_hash:
+            self.rebuild(rows)
+        # Only remembered once the rebuild went through, so a failed one is retried next poll
+        self.etag = headers.get("ETag", self.etag)
+        self.last_modified = headers.get("Last-Modified", self.last_modified)
+        self.html_hash = digest
+        if rows_hash == self.rows_hash:
+            return "markup only"
+        self.rows_hash = rows_hash
+        return "rebuilt"
+
+    def rebuild(self, rows):
+        data, cfg = self.data, self.cfg
+        profiler = Profiler(enabled=True, memory=False)
+        with profiler.stage("classify") as st:
+            data.records = rows_to_records(rows)
+            data.df = rows_to_dataframe(rows)
+            schedualer.stage_classify(data, cfg)
+            st.count(rows=len(rows))
+
+        with profiler.stage("assign") as st:
+            clinics_hash = content_hash(data.clinics)
+            st.count(rerun=clinics_hash != self.clinics_hash)
+            if clinics_hash != self.clinics_hash:
+                schedualer.stage_assign(data, cfg)
+                self.clinics_hash = clinics_hash
+
+        sessions = data.sessions()
+        with profiler.stage("index") as st:
+            with self.lock:
+                if self.index is None:
+                    self.index = RoomIndex(sessions)
+                else:
+                    self.index.update(sessions)
+            st.count(sessions=len(sessions))
+
+        with profiler.stage("conflicts") as st:
+            sessions_hash = content_hash(sessions)
+            st.count(rerun=sessions_hash != self.sessions_hash)
+            if sessions_hash != self.sessions_hash:
+                schedualer.stage_conflicts(data, cfg)
+                self.sessions_hash = sessions_hash
+
+        with profiler.stage("export"):
+            schedualer.stage_export(data, cfg)
+
+        with self.lock:
+            self.status["changes"] += 1
+            self.status["last_change"] = now()
+            self.status["counts"] = {
+                "rows": len(rows),
+                "clinics": sum(map(len, data.assigned_schedule.values())),
+                "lectures": sum(map(len, data.other_schedule.values())),
+                "sessions": len(sessions),
+            }
+            self.status["timings"] = profiler.records
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.status))
+
+    def free_rooms(self, day, start_time, end_time, location=None):
+        with self.lock:
+            if self.index is None:
+                return []
+            return self.index.free_rooms(day, start_time, end_time, location)
+
+    def run(self, interval):
+        while True:
+            t0 = time.perf_counter()
+            result = self.poll()
+            if result in ("rebuilt", "error"):
+                print(f"{now()} {result}" + (f": {self.status['last_error']['error']}" if result == "error" else ""))
+            time.sleep(max(0, interval - (time.perf_counter() - t0)))
+
+# -------------------------------
+# Local HTTP endpoints
+# -------------------------------
+def send_json(handler, payload, code=200):
+    body = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+    handler.send_response(code)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+def status_server(watcher, port, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/status":
+                send_json(self, watcher.snapshot())
+            elif url.path == "/free-rooms":
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if not {"day", "from", "to"} <= q.keys():
+                    send_json(self, {"error": "day, from and to are required"}, 400)
+                    return
+                send_json(self, watcher.free_rooms(q["day"], q["from"], q["to"], q.get("location")))
+            else:
+                send_json(self, {"error": "not found"}, 404)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def stub_server(page, port, host="127.0.0.1"):
+    """Stand-in for the materials servlet: POST returns `page`, re-read on every request, with ETag support."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with open(page, "rb") as f:
+                body = f.read()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=windows-1256")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(os.path.getmtime(page), usegmt=True))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the registrar and keep the exports up to date")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="poll the materials page and rebuild on change")
+    run.add_argument("--config", help="schedualer JSON config")
+    run.add_argument("--url", default=URL)
+    run.add_argument("--b", type=int)
+    run.add_argument("--workers", type=int)
+    run.add_argument("--out-dir", dest="out_dir")
+    run.add_argument("--exports", nargs="+", choices=schedualer.EXPORTS)
+    run.add_argument("--interval", type=float, default=300, help="seconds between polls")
+    run.add_argument("--port", type=int, default=8765, help="local status endpoint port")
+
+    stub = sub.add_parser("stub", help="serve a saved materials page locally for testing")
+    stub.add_argument("--page", required=True, help="saved HTML of the materials page")
+    stub.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        print(f"✅ Stub registrar on http://127.0.0.1:{args.port}/servlet/materials serving {args.page}")
+        stub_server(args.page, args.port).serve_forever()
+    else:
+        cfg = schedualer.load_config(args.config)
+        cfg.update({k: v for k, v in vars(args).items() if k in cfg and v is not None})
+        os.makedirs(cfg["out_dir"], exist_ok=True)
+        watcher = Watcher(cfg, args.url)
+        status_server(watcher, args.port)
+        print(f"✅ Watching {args.url} every {args.interval:g}s, status on http://127.0.0.1:{args.port}/status")
+        try:
+            watcher.run(args.interval)
+        except KeyboardInterrupt:
+            pass